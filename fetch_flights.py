@@ -22,35 +22,58 @@ EXAMPLES:
 
 import argparse
 import csv
+import functools
+import importlib.util
 import json
+import math
 import os
 import re
 import sys
+import threading
 import time
-from datetime import datetime, timedelta
+import zipfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from operator import itemgetter
 from pathlib import Path
+from typing import TextIO
+from xml.sax.saxutils import escape as xml_escape
 
 import requests
-from dotenv import load_dotenv
-from openpyxl import Workbook
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
-from tqdm import tqdm
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
-# Load environment variables
-load_dotenv()
+# openpyxl, xlsxwriter, tqdm and python-dotenv are imported inside the
+# functions that use them, so --list-airlines and CSV/JSON runs start faster
+
+try:
+    import orjson  # Optional: faster JSON parsing and serialization
+except ImportError:
+    orjson = None
 
 # Constants
 AIRLABS_BASE_URL = "https://airlabs.co/api/v9/schedules"
 CONFIG_FILE = "airlines_config.json"
 OUTPUT_DIR = "outputs"
-RATE_LIMIT_DELAY = 1  # seconds between API calls (between days)
+MAX_WORKERS = 5  # Days fetched concurrently
+MAX_REQUESTS_PER_SECOND = 5  # Shared cap across all workers
 MAX_RETRIES = 3
+EXPORT_BUFFER_SIZE = 1 << 20  # 1 MiB write buffer for file exports
 API_PAGE_LIMIT = 50  # Max results per API request (AirLabs FREE tier limit)
 MAX_PAGINATION_PAGES = 50  # Safety limit to prevent infinite loops
-# Pagination delay can be shorter than RATE_LIMIT_DELAY because:
-# 1. We're within the same logical request (fetching all pages for one day)
-# 2. AirLabs rate limits are typically per-minute, allowing burst requests
-PAGINATION_DELAY = 0.5  # seconds between pagination requests
+# Minimum spacing between page requests for the same day when no shared
+# RateLimiter is passed in (fetch_date_range always passes one, so its pages
+# are paced by the global request rate instead)
+PAGINATION_DELAY = 0.5  # seconds between pagination request starts
+
+# Strict YYYY-MM-DD shape, compiled once for validate_date
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+# Lookup indexes built by get_airline_info, keyed by id() of the config dict;
+# oldest entries are evicted so the cache stays small in long-lived processes
+_AIRLINE_INDEX_CACHE = {}
+_AIRLINE_INDEX_CACHE_SIZE = 8
 
 # CSV/Excel field names
 FIELD_NAMES = [
@@ -65,13 +88,153 @@ FIELD_NAMES = [
     "flight_status",
 ]
 
+# Flight record -> tuple in FIELD_NAMES order, for positional export rows
+_FLIGHT_ROW = itemgetter(*FIELD_NAMES)
+# Fields generate_summary reads from each record, fetched in one call
+_SUMMARY_FIELDS = itemgetter(
+    "delay_minutes", "flight_status", "departure_airport", "arrival_airport"
+)
+
+# Excel "Flight Data" headers (same order as FIELD_NAMES)
+EXCEL_HEADERS = [
+    "Flight",
+    "From",
+    "To",
+    "Sched. Dep",
+    "Actual Dep",
+    "Sched. Arr",
+    "Actual Arr",
+    "Delay (min)",
+    "Status",
+]
 
+# Excel "Flight Data" column widths. Both engines stream rows to disk, so
+# widths are fixed up front instead of auto-fitted from the written cells.
+EXCEL_COLUMN_WIDTHS = {
+    "A": 10,  # Flight
+    "B": 8,  # From
+    "C": 8,  # To
+    "D": 21,  # Sched. Dep (ISO timestamp)
+    "E": 21,  # Actual Dep
+    "F": 21,  # Sched. Arr
+    "G": 21,  # Actual Arr
+    "H": 13,  # Delay (min)
+    "I": 12,  # Status
+}
+
+# Static parts of the hand-written xlsx package used by export_to_excel_raw.
+# Cell styles: 0 default, 1 header, 2 bold label, 3 section heading, 4 title.
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" '
+    'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet2.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    "</Types>"
+)
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="xl/workbook.xml" Type="http://schemas.'
+    'openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    "</Relationships>"
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Flight Data" sheetId="1" r:id="rId1"/>'
+    '<sheet name="Summary" sheetId="2" r:id="rId2"/></sheets>'
+    "</workbook>"
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="worksheets/sheet1.xml" Type="http://schemas.'
+    'openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+    '<Relationship Id="rId2" Target="worksheets/sheet2.xml" Type="http://schemas.'
+    'openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+    '<Relationship Id="rId3" Target="styles.xml" Type="http://schemas.'
+    'openxmlformats.org/officeDocument/2006/relationships/styles"/>'
+    "</Relationships>"
+)
+_XLSX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="5">'
+    '<font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><color rgb="FFFFFFFF"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="12"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="14"/><name val="Calibri"/></font>'
+    "</fonts>"
+    '<fills count="3">'
+    '<fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill>'
+    '<fill><patternFill patternType="solid"><fgColor rgb="FF1F4E79"/></patternFill></fill>'
+    "</fills>"
+    '<borders count="2">'
+    "<border><left/><right/><top/><bottom/><diagonal/></border>"
+    '<border><left style="thin"/><right style="thin"/><top style="thin"/>'
+    '<bottom style="thin"/><diagonal/></border>'
+    "</borders>"
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/>'
+    "</cellStyleXfs>"
+    '<cellXfs count="5">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="2" borderId="1" xfId="0" applyFont="1" '
+    'applyFill="1" applyBorder="1" applyAlignment="1"><alignment horizontal="center"/></xf>'
+    '<xf numFmtId="0" fontId="2" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '<xf numFmtId="0" fontId="3" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '<xf numFmtId="0" fontId="4" fillId="0" borderId="0" xfId="0" applyFont="1" '
+    'applyAlignment="1"><alignment horizontal="center"/></xf>'
+    "</cellXfs>"
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    "</styleSheet>"
+)
+_XLSX_SHEET_OPEN = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+)
+_XLSX_COLUMNS = "ABCDEFGHI"
+# Per-column cell openers; each cell only appends its row number and style
+_XLSX_CELL_OPEN = tuple(f'<c r="{letter}' for letter in _XLSX_COLUMNS)
+_XLSX_UNSTYLED = ('"',) * len(_XLSX_COLUMNS)
+_XLSX_FLUSH_ROWS = 1000  # Rows buffered before each write to the zip stream
+# XML 1.0 forbids these; Excel stores them as _xHHHH_ escapes (as xlsxwriter does)
+_XLSX_CONTROL_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_XLSX_ESCAPE_RE = re.compile(r"(_x[0-9a-fA-F]{4}_)")
+
+
+def _json_loads(data: bytes):
+    """Parse JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(data) -> bytes:
+    """Serialize to compact JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+@functools.lru_cache(maxsize=1)
 def load_airlines_config() -> dict:
-    """Load airline configurations from JSON file."""
+    """Load airline configurations from JSON file (cached per process)."""
     config_path = Path(__file__).parent / CONFIG_FILE
     try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(config_path, "rb") as f:
+            return _json_loads(f.read())
     except FileNotFoundError:
         print(f"[ERROR] Config file not found: {config_path}")
         sys.exit(1)
@@ -80,21 +243,47 @@ def load_airlines_config() -> dict:
         sys.exit(1)
 
 
+def _build_airline_index(config: dict) -> dict:
+    """Build upper-cased IATA and ICAO lookup tables for a config."""
+    airlines = config.get("airlines", {})
+    icao_index = {}
+    for iata, info in airlines.items():
+        icao = info.get("icao", "").upper()
+        if icao:
+            icao_index.setdefault(icao, (iata, info))  # First match wins
+    return {
+        "iata": {iata.upper(): info for iata, info in airlines.items()},
+        "icao": icao_index,
+    }
+
+
+def _get_airline_index(config: dict) -> dict:
+    """Return the cached lookup index for this config object."""
+    # The cache keeps a reference to the config, so its id() cannot be reused
+    cached = _AIRLINE_INDEX_CACHE.get(id(config))
+    if cached is None or cached[0] is not config:
+        cached = (config, _build_airline_index(config))
+        _AIRLINE_INDEX_CACHE[id(config)] = cached
+        if len(_AIRLINE_INDEX_CACHE) > _AIRLINE_INDEX_CACHE_SIZE:
+            del _AIRLINE_INDEX_CACHE[next(iter(_AIRLINE_INDEX_CACHE))]
+    return cached[1]
+
+
 def get_airline_info(code: str, config: dict) -> dict | None:
     """Get airline info by IATA or ICAO code."""
-    airlines = config.get("airlines", {})
+    index = _get_airline_index(config)
+    code = code.upper()
 
     # Direct IATA lookup
-    if code.upper() in airlines:
-        return airlines[code.upper()]
+    if code in index["iata"]:
+        return index["iata"][code]
 
-    # Search by ICAO code
-    for iata, info in airlines.items():
-        if info.get("icao", "").upper() == code.upper():
-            info["iata"] = iata
-            return info
-
-    return None
+    # ICAO lookup returns a copy so the shared config is never modified
+    hit = index["icao"].get(code)
+    if hit is None:
+        return None
+    iata, info = hit
+    return {**info, "iata": iata}
 
 
 def list_airlines(config: dict) -> None:
@@ -120,11 +309,13 @@ def list_airlines(config: dict) -> None:
 
 def validate_date(date_str: str) -> bool:
     """Validate date format YYYY-MM-DD."""
-    pattern = r"^\d{4}-\d{2}-\d{2}$"
-    if not re.match(pattern, date_str):
+    # The regex rejects unpadded dates like 2025-1-1 (and, on 3.11+, the
+    # other ISO forms fromisoformat accepts); fromisoformat then checks the
+    # calendar (month range, leap days) far faster than strptime
+    if not _DATE_RE.fullmatch(date_str):
         return False
     try:
-        datetime.strptime(date_str, "%Y-%m-%d")
+        date.fromisoformat(date_str)
         return True
     except ValueError:
         return False
@@ -139,7 +330,10 @@ def validate_api_key(api_key: str) -> bool:
 
 
 def get_api_key() -> str:
-    """Get API key from environment or prompt."""
+    """Get API key from environment (.env file) or prompt."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
     api_key = os.getenv("AIRLABS_API_KEY")
 
     if api_key:
@@ -156,10 +350,51 @@ def get_api_key() -> str:
     return api_key
 
 
+def create_session() -> requests.Session:
+    """Create a pooled HTTP session shared by all AirLabs API calls."""
+    session = requests.Session()
+    # fetch_single_page does its own retries, so urllib3 must not retry too
+    adapter = HTTPAdapter(
+        pool_connections=1,  # Single host (airlabs.co)
+        pool_maxsize=MAX_WORKERS,
+        max_retries=Retry(total=0, read=False),
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces request starts evenly over time."""
+
+    def __init__(self, max_per_second: float):
+        self.interval = 1 / max_per_second
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until the caller may send its next request."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
 def fetch_single_page(
-    api_key: str, airline_iata: str, date: str, offset: int = 0
+    api_key: str,
+    airline_iata: str,
+    date: str,
+    offset: int = 0,
+    session: requests.Session = None,
+    limiter: RateLimiter = None,
 ) -> dict | None:
-    """Fetch a single page of flights with retry logic."""
+    """Fetch a single page of flights with retry logic.
+
+    The caller paces the first attempt; retries also wait on the limiter, if
+    given, so backoff from several workers cannot burst past the shared cap.
+    """
+    http_get = session.get if session is not None else requests.get
     params = {
         "api_key": api_key,
         "airline_iata": airline_iata,
@@ -169,11 +404,13 @@ def fetch_single_page(
     }
 
     for attempt in range(1, MAX_RETRIES + 1):
+        if attempt > 1 and limiter is not None:
+            limiter.acquire()
         try:
-            response = requests.get(AIRLABS_BASE_URL, params=params, timeout=30)
+            response = http_get(AIRLABS_BASE_URL, params=params, timeout=30)
             response.raise_for_status()
 
-            data = response.json()
+            data = _json_loads(response.content)
 
             if "error" in data:
                 print(f"[ERROR] API error: {data['error']}")
@@ -205,20 +442,45 @@ def fetch_single_page(
             print(f"[ERROR] Request failed: {e}")
             return None
 
+        except ValueError as e:
+            print(f"[ERROR] Invalid JSON response: {e}")
+            return None
+
     return None
 
 
 def fetch_flights_for_date(
-    api_key: str, airline_iata: str, date: str, verbose: bool = False
+    api_key: str,
+    airline_iata: str,
+    date: str,
+    verbose: bool = False,
+    session: requests.Session = None,
+    limiter: RateLimiter = None,
 ) -> dict | None:
-    """Fetch ALL flights for a date with pagination support."""
+    """Fetch ALL flights for a date with pagination support.
+
+    Pages are requested one at a time, since the page after a short page
+    would only waste API quota. Each page waits for a slot from the shared
+    limiter, or from a private one spaced PAGINATION_DELAY apart.
+
+    The result's "complete" flag is False when pagination failed mid-way or
+    hit MAX_PAGINATION_PAGES, so callers know the day holds partial data.
+    """
+    if limiter is None:
+        # Deadline-based: time already spent on the previous request counts
+        limiter = RateLimiter(1 / PAGINATION_DELAY)
+
     all_flights = []
     offset = 0
     page_count = 0
+    complete = False
 
     while page_count < MAX_PAGINATION_PAGES:  # Safety limit to prevent infinite loops
         # Fetch current page
-        data = fetch_single_page(api_key, airline_iata, date, offset)
+        limiter.acquire()
+        data = fetch_single_page(
+            api_key, airline_iata, date, offset, session, limiter=limiter
+        )
 
         if data is None:
             if all_flights:
@@ -233,6 +495,7 @@ def fetch_flights_for_date(
         page_count += 1
 
         if not flights:
+            complete = True
             break  # No more data
 
         all_flights.extend(flights)
@@ -244,19 +507,19 @@ def fetch_flights_for_date(
 
         # Check if we got all flights (fewer than limit means last page)
         if len(flights) < API_PAGE_LIMIT:
+            complete = True
             break
 
         # Move to next page
         offset += API_PAGE_LIMIT
-        time.sleep(PAGINATION_DELAY)  # Rate limiting between pages
 
     # Warn if we hit the safety limit
-    if page_count >= MAX_PAGINATION_PAGES:
+    if page_count >= MAX_PAGINATION_PAGES and not complete:
         print(
             f"  [WARN] {date}: Hit max pagination limit ({MAX_PAGINATION_PAGES} pages). Data may be incomplete."
         )
 
-    return {"response": all_flights, "pages_fetched": page_count}
+    return {"response": all_flights, "pages_fetched": page_count, "complete": complete}
 
 
 def filter_by_hub(flights: list[dict], hub_iata: str) -> list[dict]:
@@ -271,11 +534,11 @@ def filter_by_hub(flights: list[dict], hub_iata: str) -> list[dict]:
 
 def extract_flight_data(raw_data: dict) -> list[dict]:
     """Extract and normalize flight data from API response."""
-    flights = raw_data.get("response", [])
-    normalized = []
-
-    for flight in flights:
-        record = {
+    # AirLabs omits fields it doesn't know yet (e.g. dep_actual before
+    # departure), so every key needs a default; one comprehension avoids
+    # the per-record append
+    return [
+        {
             "flight_number": flight.get("flight_iata", ""),
             "departure_airport": flight.get("dep_iata", ""),
             "arrival_airport": flight.get("arr_iata", ""),
@@ -286,9 +549,8 @@ def extract_flight_data(raw_data: dict) -> list[dict]:
             "delay_minutes": flight.get("delayed", 0) or 0,
             "flight_status": flight.get("status", "unknown"),
         }
-        normalized.append(record)
-
-    return normalized
+        for flight in raw_data.get("response", [])
+    ]
 
 
 def generate_summary(flights: list[dict]) -> dict:
@@ -305,129 +567,349 @@ def generate_summary(flights: list[dict]) -> dict:
         }
 
     total = len(flights)
-    delays = [f["delay_minutes"] for f in flights if f["delay_minutes"]]
-    statuses = {}
-    routes = {}
-
-    for f in flights:
-        # Count by status
-        status = f["flight_status"]
-        statuses[status] = statuses.get(status, 0) + 1
-
-        # Count by route
-        route = f"{f['departure_airport']} → {f['arrival_airport']}"
-        routes[route] = routes.get(route, 0) + 1
-
-    avg_delay = sum(delays) / len(delays) if delays else 0
-    on_time = sum(1 for f in flights if f["delay_minutes"] < 15)
+    statuses = Counter()
+    routes = Counter()
+    delay_sum = 0
+    delay_count = 0
+    delayed = 0
+
+    # Single pass over the flights; route strings are only built for the top 10
+    for delay, status, dep, arr in map(_SUMMARY_FIELDS, flights):
+        if delay:
+            delay_sum += delay
+            delay_count += 1
+            if delay >= 15:
+                delayed += 1
+
+        statuses[status] += 1
+        routes[(dep, arr)] += 1
+
+    avg_delay = delay_sum / delay_count if delay_count else 0
+    on_time = total - delayed
 
     return {
         "total_flights": total,
         "average_delay_minutes": round(avg_delay, 1),
         "on_time_percentage": round(on_time / total * 100, 1) if total else 0,
-        "delayed_flights": sum(1 for f in flights if f["delay_minutes"] >= 15),
+        "delayed_flights": delayed,
         "cancelled_flights": statuses.get("cancelled", 0),
-        "flights_by_status": statuses,
-        "top_routes": dict(sorted(routes.items(), key=lambda x: -x[1])[:10]),
+        "flights_by_status": dict(statuses),
+        "top_routes": {
+            f"{dep} → {arr}": count for (dep, arr), count in routes.most_common(10)
+        },
     }
 
 
+def _checkpoint_path(airline: str, date: str) -> str:
+    """Return the checkpoint file path for one airline/day."""
+    return f"{OUTPUT_DIR}/checkpoint_{airline}_{date}.json"
+
+
 def save_checkpoint(data: dict, airline: str, date: str) -> str:
-    """Save raw JSON response to checkpoint file."""
+    """Save raw JSON response to checkpoint file (atomically, via a .tmp rename)."""
     Path(OUTPUT_DIR).mkdir(exist_ok=True)
-    filename = f"{OUTPUT_DIR}/checkpoint_{airline}_{date}.json"
+    filename = _checkpoint_path(airline, date)
+    tmp_filename = filename + ".tmp"
 
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    with open(tmp_filename, "wb") as f:
+        f.write(_json_dumps(data))
+    os.replace(tmp_filename, filename)
 
     return filename
 
 
+def _has_checkpoint(airline: str, date: str) -> bool:
+    """Check whether a non-empty checkpoint exists for one airline/day."""
+    try:
+        return os.path.getsize(_checkpoint_path(airline, date)) > 0
+    except OSError:
+        return False
+
+
+def load_checkpoint(airline: str, date: str) -> dict | None:
+    """Load a saved checkpoint, or None if it is missing or unreadable."""
+    try:
+        return _json_loads(Path(_checkpoint_path(airline, date)).read_bytes())
+    except (OSError, ValueError):
+        return None
+
+
 def export_to_csv(flights: list[dict], filepath: str) -> None:
     """Export flight data to CSV file."""
-    with open(filepath, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=FIELD_NAMES)
-        writer.writeheader()
-        writer.writerows(flights)
+    with open(
+        filepath, "w", newline="", encoding="utf-8", buffering=EXPORT_BUFFER_SIZE
+    ) as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELD_NAMES)
+        # Positional rows skip DictWriter's per-row key validation
+        writer.writerows(map(_FLIGHT_ROW, flights))
     print(f"[INFO] Exported to CSV: {filepath}")
 
 
-def export_to_json(flights: list[dict], summary: dict, filepath: str) -> None:
-    """Export flight data and summary to JSON file."""
+def export_to_json(
+    flights: list[dict], summary: dict, filepath: str | os.PathLike | TextIO
+) -> None:
+    """Export flight data and summary to a JSON file path or text file object.
+
+    Writing to a file object logs nothing, since the stream may be stdout and
+    an [INFO] line there would corrupt the JSON document.
+    """
     output = {"summary": summary, "flights": flights}
-    with open(filepath, "w", encoding="utf-8") as f:
+    if not isinstance(filepath, (str, os.PathLike)):
+        json.dump(output, filepath, indent=2)
+        return
+    # json.dump emits many small chunks, so a large buffer batches the writes
+    with open(filepath, "w", encoding="utf-8", buffering=EXPORT_BUFFER_SIZE) as f:
         json.dump(output, f, indent=2)
     print(f"[INFO] Exported to JSON: {filepath}")
 
 
 def export_to_excel(
+    flights: list[dict],
+    summary: dict,
+    airline_name: str,
+    filepath: str,
+    engine: str = "xlsxwriter",
+) -> None:
+    """Export flight data and summary to Excel file with the chosen engine."""
+    if engine == "openpyxl":
+        export_to_excel_openpyxl(flights, summary, airline_name, filepath)
+    elif engine == "raw":
+        export_to_excel_raw(flights, summary, airline_name, filepath)
+    else:
+        export_to_excel_xlsxwriter(flights, summary, airline_name, filepath)
+    print(f"[INFO] Exported to Excel: {filepath}")
+
+
+def export_to_excel_xlsxwriter(
+    flights: list[dict], summary: dict, airline_name: str, filepath: str
+) -> None:
+    """Write the Excel export with xlsxwriter, flushing each row to disk."""
+    import xlsxwriter
+
+    wb = xlsxwriter.Workbook(filepath, {"constant_memory": True})
+
+    header_fmt = wb.add_format(
+        {
+            "bold": True,
+            "font_color": "#FFFFFF",
+            "bg_color": "#1F4E79",
+            "align": "center",
+            "border": 1,
+        }
+    )
+    bold_fmt = wb.add_format({"bold": True})
+    section_fmt = wb.add_format({"bold": True, "font_size": 12})
+    title_fmt = wb.add_format({"bold": True, "font_size": 14, "align": "center"})
+
+    # Sheet 1: Flight Data (constant_memory requires rows in ascending order)
+    ws_data = wb.add_worksheet("Flight Data")
+    for col, width in enumerate(EXCEL_COLUMN_WIDTHS.values()):
+        ws_data.set_column(col, col, width)
+
+    ws_data.write_row(0, 0, EXCEL_HEADERS, header_fmt)
+    for row, flight in enumerate(flights, 1):
+        ws_data.write_row(row, 0, _FLIGHT_ROW(flight))
+
+    # Sheet 2: Summary
+    ws_summary = wb.add_worksheet("Summary")
+    ws_summary.set_column(0, 0, 30)
+    ws_summary.set_column(1, 1, 20)
+
+    ws_summary.merge_range(0, 0, 0, 1, f"{airline_name} Flight Summary", title_fmt)
+
+    summary_data = [
+        ("Total Flights", summary["total_flights"]),
+        ("Average Delay (minutes)", summary["average_delay_minutes"]),
+        ("On-Time Performance", f"{summary['on_time_percentage']}%"),
+        ("Delayed Flights (≥15 min)", summary["delayed_flights"]),
+        ("Cancelled Flights", summary["cancelled_flights"]),
+    ]
+    row = 2
+    for label, value in summary_data:
+        ws_summary.write(row, 0, label, bold_fmt)
+        ws_summary.write(row, 1, value)
+        row += 1
+
+    # Status breakdown
+    row += 2
+    ws_summary.write(row, 0, "Flights by Status", section_fmt)
+    for status, count in summary["flights_by_status"].items():
+        row += 1
+        ws_summary.write_row(row, 0, (status.title(), count))
+
+    # Top routes
+    row += 3
+    ws_summary.write(row, 0, "Top 10 Routes", section_fmt)
+    for route, count in summary["top_routes"].items():
+        row += 1
+        ws_summary.write_row(row, 0, (route, count))
+
+    wb.close()
+
+
+def _xlsx_text(value) -> str:
+    """Escape a cell string for SpreadsheetML, encoding control characters."""
+    text = xml_escape(str(value))
+    if "_x" in text:
+        # Keep literal _xHHHH_ text from being decoded as an escape
+        text = _XLSX_ESCAPE_RE.sub(r"_x005F\1", text)
+    return _XLSX_CONTROL_RE.sub(lambda m: f"_x{ord(m.group()):04X}_", text)
+
+
+def _xlsx_row(row: int, values, styles=None) -> str:
+    """Render one worksheet row as SpreadsheetML with inline strings."""
+    if styles is None:
+        suffixes = _XLSX_UNSTYLED
+    else:
+        suffixes = [f'" s="{style}"' if style else '"' for style in styles]
+    cells = []
+    for cell_open, suffix, value in zip(_XLSX_CELL_OPEN, suffixes, values):
+        if value is None or value == "":
+            continue
+        if isinstance(value, (int, float)):
+            cells.append(f"{cell_open}{row}{suffix}><v>{value}</v></c>")
+        else:
+            cells.append(
+                f'{cell_open}{row}{suffix} t="inlineStr">'
+                f"<is><t>{_xlsx_text(value)}</t></is></c>"
+            )
+    return f'<row r="{row}">{"".join(cells)}</row>'
+
+
+def export_to_excel_raw(
     flights: list[dict], summary: dict, airline_name: str, filepath: str
 ) -> None:
-    """Export flight data and summary to Excel file."""
-    wb = Workbook()
+    """Write the Excel export as raw SpreadsheetML, streamed into the zip."""
+    with zipfile.ZipFile(filepath, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _XLSX_CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _XLSX_ROOT_RELS)
+        zf.writestr("xl/workbook.xml", _XLSX_WORKBOOK)
+        zf.writestr("xl/_rels/workbook.xml.rels", _XLSX_WORKBOOK_RELS)
+        zf.writestr("xl/styles.xml", _XLSX_STYLES)
+
+        # Sheet 1: Flight Data, written in batches so memory stays flat
+        with zf.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            cols = "".join(
+                f'<col min="{i}" max="{i}" width="{width}" customWidth="1"/>'
+                for i, width in enumerate(EXCEL_COLUMN_WIDTHS.values(), 1)
+            )
+            sheet.write(f"{_XLSX_SHEET_OPEN}<cols>{cols}</cols><sheetData>".encode())
+            sheet.write(_xlsx_row(1, EXCEL_HEADERS, (1,) * len(EXCEL_HEADERS)).encode())
+
+            buffer = []
+            for row, flight in enumerate(flights, 2):
+                buffer.append(_xlsx_row(row, _FLIGHT_ROW(flight)))
+                if len(buffer) >= _XLSX_FLUSH_ROWS:
+                    sheet.write("".join(buffer).encode())
+                    buffer.clear()
+            sheet.write("".join(buffer).encode())
+            sheet.write(b"</sheetData></worksheet>")
+
+        # Sheet 2: Summary (same layout as the other engines)
+        rows = [_xlsx_row(1, (f"{airline_name} Flight Summary",), (4,))]
+        summary_data = [
+            ("Total Flights", summary["total_flights"]),
+            ("Average Delay (minutes)", summary["average_delay_minutes"]),
+            ("On-Time Performance", f"{summary['on_time_percentage']}%"),
+            ("Delayed Flights (≥15 min)", summary["delayed_flights"]),
+            ("Cancelled Flights", summary["cancelled_flights"]),
+        ]
+        row = 2
+        for label, value in summary_data:
+            row += 1
+            rows.append(_xlsx_row(row, (label, value), (2, 0)))
+
+        row += 3
+        rows.append(_xlsx_row(row, ("Flights by Status",), (3,)))
+        for status, count in summary["flights_by_status"].items():
+            row += 1
+            rows.append(_xlsx_row(row, (status.title(), count)))
+
+        row += 3
+        rows.append(_xlsx_row(row, ("Top 10 Routes",), (3,)))
+        for route, count in summary["top_routes"].items():
+            row += 1
+            rows.append(_xlsx_row(row, (route, count)))
+
+        zf.writestr(
+            "xl/worksheets/sheet2.xml",
+            f"{_XLSX_SHEET_OPEN}<cols>"
+            '<col min="1" max="1" width="30" customWidth="1"/>'
+            '<col min="2" max="2" width="20" customWidth="1"/>'
+            f"</cols><sheetData>{''.join(rows)}</sheetData>"
+            '<mergeCells count="1"><mergeCell ref="A1:B1"/></mergeCells>'
+            "</worksheet>",
+        )
+
+
+@functools.lru_cache(maxsize=1)
+def _openpyxl_styles() -> dict:
+    """Build the shared openpyxl styles once; exports assign them by reference."""
+    from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
+    thin = Side(style="thin")
+    return {
+        "header_fill": PatternFill(
+            start_color="1F4E79", end_color="1F4E79", fill_type="solid"
+        ),
+        "header_font": Font(color="FFFFFF", bold=True),
+        "bold_font": Font(bold=True),
+        "section_font": Font(bold=True, size=12),
+        "title_font": Font(size=14, bold=True),
+        "center": Alignment(horizontal="center"),
+        "thin_border": Border(left=thin, right=thin, top=thin, bottom=thin),
+    }
+
+
+def export_to_excel_openpyxl(
+    flights: list[dict], summary: dict, airline_name: str, filepath: str
+) -> None:
+    """Write the Excel export with openpyxl in write-only (streamed) mode."""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+
+    styles = _openpyxl_styles()
+    wb = Workbook(write_only=True)
 
     # Sheet 1: Flight Data
-    ws_data = wb.active
-    ws_data.title = "Flight Data"
+    ws_data = wb.create_sheet(title="Flight Data")
 
-    # Header styling
-    header_fill = PatternFill(
-        start_color="1F4E79", end_color="1F4E79", fill_type="solid"
-    )
-    header_font = Font(color="FFFFFF", bold=True)
-    thin_border = Border(
-        left=Side(style="thin"),
-        right=Side(style="thin"),
-        top=Side(style="thin"),
-        bottom=Side(style="thin"),
-    )
+    # Column widths must be set before any rows are streamed
+    for letter, width in EXCEL_COLUMN_WIDTHS.items():
+        ws_data.column_dimensions[letter].width = width
 
     # Write headers
-    headers = [
-        "Flight",
-        "From",
-        "To",
-        "Sched. Dep",
-        "Actual Dep",
-        "Sched. Arr",
-        "Actual Arr",
-        "Delay (min)",
-        "Status",
-    ]
-    for col, header in enumerate(headers, 1):
-        cell = ws_data.cell(row=1, column=col, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center")
-        cell.border = thin_border
+    header_cells = []
+    for header in EXCEL_HEADERS:
+        cell = WriteOnlyCell(ws_data, value=header)
+        cell.fill = styles["header_fill"]
+        cell.font = styles["header_font"]
+        cell.alignment = styles["center"]
+        cell.border = styles["thin_border"]
+        header_cells.append(cell)
+    ws_data.append(header_cells)
 
     # Write data
-    for row, flight in enumerate(flights, 2):
-        ws_data.cell(row=row, column=1, value=flight["flight_number"])
-        ws_data.cell(row=row, column=2, value=flight["departure_airport"])
-        ws_data.cell(row=row, column=3, value=flight["arrival_airport"])
-        ws_data.cell(row=row, column=4, value=flight["scheduled_departure"])
-        ws_data.cell(row=row, column=5, value=flight["actual_departure"])
-        ws_data.cell(row=row, column=6, value=flight["scheduled_arrival"])
-        ws_data.cell(row=row, column=7, value=flight["actual_arrival"])
-        ws_data.cell(row=row, column=8, value=flight["delay_minutes"])
-        ws_data.cell(row=row, column=9, value=flight["flight_status"])
-
-    # Auto-adjust column widths
-    for col in ws_data.columns:
-        max_length = max(len(str(cell.value or "")) for cell in col)
-        ws_data.column_dimensions[col[0].column_letter].width = min(max_length + 2, 30)
+    for flight in flights:
+        ws_data.append(_FLIGHT_ROW(flight))
 
     # Sheet 2: Summary
     ws_summary = wb.create_sheet(title="Summary")
+    ws_summary.column_dimensions["A"].width = 30
+    ws_summary.column_dimensions["B"].width = 20
+
+    def label_cell(value, font=styles["bold_font"]):
+        cell = WriteOnlyCell(ws_summary, value=value)
+        cell.font = font
+        return cell
 
     # Title
-    ws_summary.merge_cells("A1:B1")
-    title_cell = ws_summary.cell(
-        row=1, column=1, value=f"{airline_name} Flight Summary"
-    )
-    title_cell.font = Font(size=14, bold=True)
-    title_cell.alignment = Alignment(horizontal="center")
+    title_cell = label_cell(f"{airline_name} Flight Summary", font=styles["title_font"])
+    title_cell.alignment = styles["center"]
+    ws_summary.append([title_cell])
+    ws_summary.merged_cells.add("A1:B1")
+    ws_summary.append([])
 
     # Summary metrics
     summary_data = [
@@ -438,34 +920,24 @@ def export_to_excel(
         ("Cancelled Flights", summary["cancelled_flights"]),
     ]
 
-    for row, (label, value) in enumerate(summary_data, 3):
-        ws_summary.cell(row=row, column=1, value=label).font = Font(bold=True)
-        ws_summary.cell(row=row, column=2, value=value)
+    for label, value in summary_data:
+        ws_summary.append([label_cell(label), value])
 
     # Status breakdown
-    row_offset = len(summary_data) + 5
-    ws_summary.cell(row=row_offset, column=1, value="Flights by Status").font = Font(
-        bold=True, size=12
-    )
-    for i, (status, count) in enumerate(summary["flights_by_status"].items(), 1):
-        ws_summary.cell(row=row_offset + i, column=1, value=status.title())
-        ws_summary.cell(row=row_offset + i, column=2, value=count)
+    ws_summary.append([])
+    ws_summary.append([])
+    ws_summary.append([label_cell("Flights by Status", font=styles["section_font"])])
+    for status, count in summary["flights_by_status"].items():
+        ws_summary.append([status.title(), count])
 
     # Top routes
-    row_offset += len(summary["flights_by_status"]) + 3
-    ws_summary.cell(row=row_offset, column=1, value="Top 10 Routes").font = Font(
-        bold=True, size=12
-    )
-    for i, (route, count) in enumerate(summary["top_routes"].items(), 1):
-        ws_summary.cell(row=row_offset + i, column=1, value=route)
-        ws_summary.cell(row=row_offset + i, column=2, value=count)
-
-    # Adjust column widths
-    ws_summary.column_dimensions["A"].width = 30
-    ws_summary.column_dimensions["B"].width = 20
+    ws_summary.append([])
+    ws_summary.append([])
+    ws_summary.append([label_cell("Top 10 Routes", font=styles["section_font"])])
+    for route, count in summary["top_routes"].items():
+        ws_summary.append([route, count])
 
     wb.save(filepath)
-    print(f"[INFO] Exported to Excel: {filepath}")
 
 
 def generate_output_filename(airline: str, format: str) -> str:
@@ -505,7 +977,7 @@ def interactive_mode(config: dict) -> tuple:
     print(f"[INFO] Selected: {airline_info['name']}")
 
     # Date selection
-    yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
     print("\nEnter start date (YYYY-MM-DD)")
     start_date = input(f"Start date [{yesterday}]: ").strip()
     start_date = start_date if start_date else yesterday
@@ -534,61 +1006,103 @@ def interactive_mode(config: dict) -> tuple:
 def fetch_date_range(
     api_key: str,
     airline: str,
-    start_date: str,
-    end_date: str,
+    start: date,
+    end: date,
     verbose: bool = False,
     hub: str = None,
+    session: requests.Session = None,
+    checkpoints: bool = True,
+    resume: bool = False,
 ) -> list[dict]:
-    """Fetch flights for a date range with pagination and progress bar."""
-    start = datetime.strptime(start_date, "%Y-%m-%d")
-    end = datetime.strptime(end_date, "%Y-%m-%d")
+    """Fetch flights for a date range concurrently with a shared rate limit.
+
+    With resume=True, days that already have a complete checkpoint are
+    loaded from disk instead of calling the API; partial days are re-fetched.
+    """
+    from tqdm import tqdm
 
     total_days = (end - start).days + 1
+    dates = [(start + timedelta(days=i)).isoformat() for i in range(total_days)]
+    results = {}
     all_flights = []
     daily_stats = []
 
     print(f"\n[INFO] Fetching {total_days} day(s) of data for {airline}...")
     print("[INFO] Pagination enabled - fetching ALL flights per day")
 
-    with tqdm(total=total_days, desc="Fetching", unit="day") as pbar:
-        current = start
-        while current <= end:
-            date_str = current.strftime("%Y-%m-%d")
-
-            raw_data = fetch_flights_for_date(api_key, airline, date_str, verbose)
-
-            if raw_data:
-                flights = extract_flight_data(raw_data)
-
-                # Apply hub filter if specified
-                if hub:
-                    flights = filter_by_hub(flights, hub)
-
-                day_count = len(flights)
-                pages = raw_data.get("pages_fetched", 1)
-                all_flights.extend(flights)
-                daily_stats.append(
-                    {"date": date_str, "flights": day_count, "pages": pages}
-                )
-                save_checkpoint(raw_data, airline, date_str)
-
-                # Update progress bar with flight count
-                if hub:
-                    pbar.set_postfix(
-                        {"flights": f"{day_count} (filtered)", "pages": pages}
-                    )
-                else:
-                    pbar.set_postfix({"flights": day_count, "pages": pages})
-
-            else:
-                daily_stats.append({"date": date_str, "flights": 0, "pages": 0})
-
-            current += timedelta(days=1)
-            pbar.update(1)
+    # One pooled session shared by all workers so connections are reused
+    own_session = session is None
+    if own_session:
+        session = create_session()
+
+    limiter = RateLimiter(MAX_REQUESTS_PER_SECOND)
+
+    def fetch_day(date_str: str) -> tuple[dict | None, bool]:
+        if resume and _has_checkpoint(airline, date_str):
+            cached = load_checkpoint(airline, date_str)
+            # Checkpoints written before the flag existed are trusted as before
+            if cached is not None and cached.get("complete", True):
+                return cached, True
+            if cached is not None:
+                print(f"  [INFO] {date_str}: checkpoint is partial, re-fetching")
+        raw = fetch_flights_for_date(
+            api_key, airline, date_str, verbose, session, limiter=limiter
+        )
+        return raw, False
 
-            # Rate limiting between days
-            if current <= end:
-                time.sleep(RATE_LIMIT_DELAY)
+    try:
+        # Redraw at most twice a second, and not at all when stderr is piped
+        with tqdm(
+            total=total_days,
+            desc="Fetching",
+            unit="day",
+            mininterval=0.5,
+            smoothing=0.1,
+            dynamic_ncols=True,
+            disable=not sys.stderr.isatty(),
+        ) as pbar:
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                futures = {executor.submit(fetch_day, d): d for d in dates}
+
+                try:
+                    for future in as_completed(futures):
+                        date_str = futures[future]
+                        raw_data, from_checkpoint = future.result()
+
+                        if raw_data:
+                            flights = extract_flight_data(raw_data)
+
+                            # Apply hub filter if specified
+                            if hub:
+                                flights = filter_by_hub(flights, hub)
+
+                            day_count = len(flights)
+                            pages = raw_data.get("pages_fetched", 1)
+                            results[date_str] = (flights, pages)
+                            if checkpoints and not from_checkpoint:
+                                save_checkpoint(raw_data, airline, date_str)
+
+                            # Update progress bar with flight count; drawn on the next tick
+                            filtered = " (filtered)" if hub else ""
+                            pbar.set_postfix_str(
+                                f"flights={day_count}{filtered}, pages={pages}",
+                                refresh=False,
+                            )
+
+                        pbar.update(1)
+                except BaseException:
+                    # Drop queued days so Ctrl-C or an error stops spending quota
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise
+    finally:
+        if own_session:
+            session.close()
+
+    # Assemble results in date order regardless of completion order
+    for date_str in dates:
+        flights, pages = results.get(date_str, ([], 0))
+        all_flights.extend(flights)
+        daily_stats.append({"date": date_str, "flights": len(flights), "pages": pages})
 
     # Print daily statistics summary
     if daily_stats:
@@ -637,6 +1151,23 @@ Examples:
         default="excel",
         help="Output format (default: excel)",
     )
+    parser.add_argument(
+        "--engine",
+        choices=["xlsxwriter", "openpyxl", "raw"],
+        default="xlsxwriter",
+        help="Excel writer (default: xlsxwriter; openpyxl for style fidelity; "
+        "raw for very large exports)",
+    )
+    parser.add_argument(
+        "--no-checkpoints",
+        action="store_true",
+        help="Skip writing per-day raw JSON checkpoint files",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Reuse existing checkpoint files instead of re-fetching those days",
+    )
     parser.add_argument(
         "--list-airlines", action="store_true", help="List all available airlines"
     )
@@ -670,16 +1201,16 @@ Examples:
             sys.exit(1)
 
         # Determine dates
-        today = datetime.now()
+        today = date.today()
         if args.yesterday:
-            start_date = (today - timedelta(days=1)).strftime("%Y-%m-%d")
+            start_date = (today - timedelta(days=1)).isoformat()
             end_date = start_date
         elif args.last_week:
-            start_date = (today - timedelta(days=7)).strftime("%Y-%m-%d")
-            end_date = (today - timedelta(days=1)).strftime("%Y-%m-%d")
+            start_date = (today - timedelta(days=7)).isoformat()
+            end_date = (today - timedelta(days=1)).isoformat()
         elif args.last_month:
-            start_date = (today - timedelta(days=30)).strftime("%Y-%m-%d")
-            end_date = (today - timedelta(days=1)).strftime("%Y-%m-%d")
+            start_date = (today - timedelta(days=30)).isoformat()
+            end_date = (today - timedelta(days=1)).isoformat()
         else:
             start_date = args.start_date
             end_date = args.end_date or start_date
@@ -699,15 +1230,26 @@ Examples:
             print(f"[ERROR] Invalid end date format: {end_date}")
             sys.exit(1)
 
+    # A missing Excel writer would otherwise only fail after the whole fetch
+    if output_format == "excel" and args.engine != "raw":
+        if importlib.util.find_spec(args.engine) is None:
+            print(f"[ERROR] The '{args.engine}' Excel engine is not installed")
+            print(
+                f"        Run: pip install {args.engine}  "
+                "(or use --engine raw / --format csv)"
+            )
+            sys.exit(1)
+
     # Get airline info for display
     airline_info = get_airline_info(airline, config)
     airline_name = airline_info["name"] if airline_info else airline
 
     # Calculate API calls needed
-    start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-    end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-    total_days = (end_dt - start_dt).days + 1
-    est_time = total_days * (RATE_LIMIT_DELAY + 1)  # ~2 seconds per call
+    # Parse the validated dates once; everything downstream uses date objects
+    start = date.fromisoformat(start_date)
+    end = date.fromisoformat(end_date)
+    total_days = (end - start).days + 1
+    est_time = math.ceil(total_days / MAX_WORKERS) * 2  # ~2 seconds per batch
 
     # Confirmation
     print("\n" + "=" * 50)
@@ -743,7 +1285,23 @@ Examples:
             print(f"        Got: '{hub}'")
             sys.exit(1)
         hub = hub.upper()
-    flights = fetch_date_range(api_key, airline, start_date, end_date, verbose, hub)
+
+    # Reuse one keep-alive connection pool for every API call in this run
+    session = create_session()
+    try:
+        flights = fetch_date_range(
+            api_key,
+            airline,
+            start,
+            end,
+            verbose,
+            hub,
+            session=session,
+            checkpoints=not args.no_checkpoints,
+            resume=args.resume,
+        )
+    finally:
+        session.close()
 
     if not flights:
         print("\n[WARN] No flights found for the specified criteria")
@@ -758,7 +1316,7 @@ Examples:
     elif output_format == "json":
         export_to_json(flights, summary, output_file)
     else:  # excel
-        export_to_excel(flights, summary, airline_name, output_file)
+        export_to_excel(flights, summary, airline_name, output_file, args.engine)
 
     # Print summary
     print("\n" + "=" * 50)
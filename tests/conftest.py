@@ -2,100 +2,209 @@
 Pytest configuration and fixtures
 """
 
+import copy
+import json
+import os
+from pathlib import Path
+from types import MappingProxyType
+
 import pytest
 
+# Imported at conftest load so the first test isn't charged for it
+from fetch_flights import extract_flight_data, generate_summary, load_airlines_config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _freeze(mapping):
+    """Wrap a dict and every nested dict in MappingProxyType"""
+    return MappingProxyType(
+        {
+            key: _freeze(value) if isinstance(value, dict) else value
+            for key, value in mapping.items()
+        }
+    )
+
+
+@pytest.fixture(autouse=True)
+def _no_sleep(monkeypatch):
+    """Make time.sleep a no-op so retry and rate-limit waits never block a test"""
+    monkeypatch.setattr("time.sleep", lambda *args, **kwargs: None)
+
 
 @pytest.fixture
+def silent_print(monkeypatch):
+    """Drop print() output in tests that do not assert on it"""
+    monkeypatch.setattr("builtins.print", lambda *args, **kwargs: None)
+
+
+# Canned AirLabs response, shared read-only across the run
+_API_RESPONSE = {
+    "response": [
+        {
+            "flight_iata": "SQ317",
+            "flight_icao": "SIA317",
+            "dep_iata": "SIN",
+            "arr_iata": "LHR",
+            "dep_time": "2025-01-01T23:30:00",
+            "arr_time": "2025-01-02T06:15:00",
+            "dep_actual": "2025-01-01T23:42:00",
+            "arr_actual": "2025-01-02T06:25:00",
+            "delayed": 12,
+            "status": "landed",
+        },
+        {
+            "flight_iata": "SQ322",
+            "flight_icao": "SIA322",
+            "dep_iata": "LHR",
+            "arr_iata": "SIN",
+            "dep_time": "2025-01-01T13:10:00",
+            "arr_time": "2025-01-02T08:45:00",
+            "dep_actual": "2025-01-01T13:05:00",
+            "arr_actual": "2025-01-02T08:40:00",
+            "delayed": 0,
+            "status": "landed",
+        },
+        {
+            "flight_iata": "SQ001",
+            "flight_icao": "SIA001",
+            "dep_iata": "SIN",
+            "arr_iata": "HKG",
+            "dep_time": "2025-01-01T08:00:00",
+            "arr_time": "2025-01-01T12:00:00",
+            "dep_actual": None,
+            "arr_actual": None,
+            "delayed": 30,
+            "status": "delayed",
+        },
+    ]
+}
+
+
+@pytest.fixture(scope="session")
+def repo_files():
+    """Names of the files in the repo root, from a single directory scan"""
+    with os.scandir(REPO_ROOT) as entries:
+        return frozenset(e.name for e in entries if e.is_file())
+
+
+@pytest.fixture(scope="session")
+def airlines_config():
+    """Parse the real airlines_config.json once per run (tests must not mutate it)"""
+    data = (REPO_ROOT / "airlines_config.json").read_bytes()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+@pytest.fixture(scope="session")
+def real_airlines_config():
+    """Config as returned by load_airlines_config(), loaded once per run"""
+    return load_airlines_config()
+
+
+@pytest.fixture(scope="session")
+def env_example_text():
+    """Contents of .env.example, read once per run"""
+    return (REPO_ROOT / ".env.example").read_bytes().decode("utf-8")
+
+
+@pytest.fixture(scope="session")
+def requirements_text_lower():
+    """Lowercased contents of requirements.txt, read once per run"""
+    return (REPO_ROOT / "requirements.txt").read_bytes().decode("utf-8").lower()
+
+
+@pytest.fixture(scope="session")
+def requirements_dev_text_lower():
+    """Lowercased contents of requirements-dev.txt, read once per run"""
+    return (REPO_ROOT / "requirements-dev.txt").read_bytes().decode("utf-8").lower()
+
+
+@pytest.fixture(scope="session")
 def mock_api_key():
     """Provide a mock API key for testing"""
     return "test_api_key_1234567890abcdef"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_airline_config():
-    """Provide mock airline configuration (matches actual structure)"""
-    return {
-        "airlines": {
-            "SQ": {
-                "name": "Singapore Airlines",
-                "iata": "SQ",
-                "icao": "SIA",
-                "country": "Singapore",
-            },
-            "EK": {"name": "Emirates", "iata": "EK", "icao": "UAE", "country": "UAE"},
-            "QR": {
-                "name": "Qatar Airways",
-                "iata": "QR",
-                "icao": "QTR",
-                "country": "Qatar",
-            },
+    """Provide mock airline configuration (matches actual structure, read-only)"""
+    return _freeze(
+        {
+            "airlines": {
+                "SQ": {
+                    "name": "Singapore Airlines",
+                    "iata": "SQ",
+                    "icao": "SIA",
+                    "country": "Singapore",
+                },
+                "EK": {
+                    "name": "Emirates",
+                    "iata": "EK",
+                    "icao": "UAE",
+                    "country": "UAE",
+                },
+                "QR": {
+                    "name": "Qatar Airways",
+                    "iata": "QR",
+                    "icao": "QTR",
+                    "country": "Qatar",
+                },
+            }
         }
-    }
+    )
 
 
 @pytest.fixture
 def mock_api_response():
-    """Provide mock AirLabs API response"""
-    return {
-        "response": [
-            {
-                "flight_iata": "SQ317",
-                "flight_icao": "SIA317",
-                "dep_iata": "SIN",
-                "arr_iata": "LHR",
-                "dep_time": "2025-01-01T23:30:00",
-                "arr_time": "2025-01-02T06:15:00",
-                "dep_actual": "2025-01-01T23:42:00",
-                "arr_actual": "2025-01-02T06:25:00",
-                "delayed": 12,
-                "status": "landed",
-            },
-            {
-                "flight_iata": "SQ322",
-                "flight_icao": "SIA322",
-                "dep_iata": "LHR",
-                "arr_iata": "SIN",
-                "dep_time": "2025-01-01T13:10:00",
-                "arr_time": "2025-01-02T08:45:00",
-                "dep_actual": "2025-01-01T13:05:00",
-                "arr_actual": "2025-01-02T08:40:00",
-                "delayed": 0,
-                "status": "landed",
-            },
-            {
-                "flight_iata": "SQ001",
-                "flight_icao": "SIA001",
-                "dep_iata": "SIN",
-                "arr_iata": "HKG",
-                "dep_time": "2025-01-01T08:00:00",
-                "arr_time": "2025-01-01T12:00:00",
-                "dep_actual": None,
-                "arr_actual": None,
-                "delayed": 30,
-                "status": "delayed",
-            },
-        ]
-    }
+    """Per-test deep copy of the mock AirLabs API response"""
+    return copy.deepcopy(_API_RESPONSE)
+
+
+@pytest.fixture(scope="session")
+def extracted_flights_base():
+    """extract_flight_data() of the mock response, computed once per run"""
+    return extract_flight_data(_API_RESPONSE)
 
 
 @pytest.fixture
+def extracted_flights(extracted_flights_base):
+    """Per-test copy of the normalized mock flights"""
+    return copy.deepcopy(extracted_flights_base)
+
+
+@pytest.fixture(scope="session")
+def summary_base(extracted_flights_base):
+    """generate_summary() of the mock flights, computed once per run"""
+    return generate_summary(extracted_flights_base)
+
+
+@pytest.fixture
+def flight_summary(summary_base):
+    """Per-test copy of the mock flight summary"""
+    return copy.deepcopy(summary_base)
+
+
+@pytest.fixture(scope="session")
 def sample_date():
     """Provide a sample date for testing"""
     return "2025-01-01"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_date_range():
-    """Provide a sample date range for testing"""
-    return {"start": "2025-01-01", "end": "2025-01-07"}
+    """Provide a sample date range for testing (read-only)"""
+    return MappingProxyType({"start": "2025-01-01", "end": "2025-01-07"})
 
 
-@pytest.fixture
-def temp_output_dir(tmp_path):
-    """Create temporary output directory for tests"""
-    output_dir = tmp_path / "outputs"
-    output_dir.mkdir()
-    return str(output_dir)
+@pytest.fixture(scope="session")
+def temp_output_dir(tmp_path_factory):
+    """Temporary output directory shared by the run (tests use unique file names)"""
+    return str(tmp_path_factory.mktemp("outputs"))
 
 
 @pytest.fixture
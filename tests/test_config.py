@@ -2,101 +2,101 @@
 Tests for configuration validation
 """
 
-import json
-import os
+import fastjsonschema
+import pytest
+
+# Compiled once at import; validates every airline entry in one call
+_VALIDATE_AIRLINES = fastjsonschema.compile(
+    {
+        "type": "object",
+        "additionalProperties": {
+            "type": "object",
+            "required": ["name"],
+            "properties": {
+                "name": {"type": "string"},
+                "iata": {"type": "string"},
+                "icao": {"type": "string"},
+            },
+            "anyOf": [{"required": ["iata"]}, {"required": ["icao"]}],
+        },
+    }
+)
 
 
 class TestAirlinesConfig:
     """Tests for airlines_config.json"""
 
-    def test_config_file_exists(self):
+    def test_config_file_exists(self, repo_files):
         """Test that airlines_config.json exists"""
-        assert os.path.exists("airlines_config.json")
+        assert "airlines_config.json" in repo_files
 
-    def test_config_valid_json(self):
+    def test_config_valid_json(self, airlines_config):
         """Test that airlines_config.json is valid JSON"""
-        with open("airlines_config.json", "r") as f:
-            config = json.load(f)
-            assert isinstance(config, dict)
+        assert isinstance(airlines_config, dict)
 
-    def test_config_has_airlines_key(self):
+    def test_config_has_airlines_key(self, airlines_config):
         """Test that config has airlines key"""
-        with open("airlines_config.json", "r") as f:
-            config = json.load(f)
-            assert "airlines" in config
+        assert "airlines" in airlines_config
 
-    def test_config_has_minimum_airlines(self):
+    def test_config_has_minimum_airlines(self, airlines_config):
         """Test that config has at least 10 airlines"""
-        with open("airlines_config.json", "r") as f:
-            config = json.load(f)
-            airlines = config.get("airlines", {})
-            assert len(airlines) >= 10
+        airlines = airlines_config.get("airlines", {})
+        assert len(airlines) >= 10
 
-    def test_config_airline_structure(self):
+    def test_config_airline_structure(self, airlines_config):
         """Test each airline has required fields"""
-        with open("airlines_config.json", "r") as f:
-            config = json.load(f)
-            airlines = config.get("airlines", {})
+        _VALIDATE_AIRLINES(airlines_config.get("airlines", {}))
 
-            for code, info in airlines.items():
-                assert isinstance(info, dict), f"Airline {code} must be a dict"
-                assert "name" in info, f"Airline {code} missing 'name'"
-                assert "iata" in info or "icao" in info, f"Airline {code} missing code"
+    def test_airline_schema_rejects_missing_code(self):
+        """Test the airline schema catches an entry with no IATA/ICAO code"""
+        with pytest.raises(fastjsonschema.JsonSchemaException):
+            _VALIDATE_AIRLINES({"XX": {"name": "No Code Air"}})
 
-    def test_config_has_singapore_airlines(self):
+    def test_config_has_singapore_airlines(self, airlines_config):
         """Test that Singapore Airlines (SQ) is in config"""
-        with open("airlines_config.json", "r") as f:
-            config = json.load(f)
-            airlines = config.get("airlines", {})
-            assert "SQ" in airlines
-            assert airlines["SQ"]["name"] == "Singapore Airlines"
+        airlines = airlines_config.get("airlines", {})
+        assert "SQ" in airlines
+        assert airlines["SQ"]["name"] == "Singapore Airlines"
 
 
 class TestEnvExample:
     """Tests for .env.example file"""
 
-    def test_env_example_exists(self):
+    def test_env_example_exists(self, repo_files):
         """Test that .env.example exists"""
-        assert os.path.exists(".env.example")
+        assert ".env.example" in repo_files
 
-    def test_env_example_has_api_key(self):
+    def test_env_example_has_api_key(self, env_example_text):
         """Test .env.example has API key placeholder"""
-        with open(".env.example", "r") as f:
-            content = f.read()
-            assert "AIRLABS_API_KEY" in content
+        assert "AIRLABS_API_KEY" in env_example_text
 
-    def test_env_example_no_real_key(self):
+    def test_env_example_no_real_key(self, env_example_text):
         """Test .env.example doesn't contain a real API key"""
-        with open(".env.example", "r") as f:
-            content = f.read()
-            # Check it's a placeholder, not a real key
-            assert "your_api_key_here" in content.lower() or "your" in content.lower()
+        # Check it's a placeholder, not a real key
+        content = env_example_text.lower()
+        assert "your_api_key_here" in content or "your" in content
 
 
 class TestRequirements:
     """Tests for requirements files"""
 
-    def test_requirements_exists(self):
+    def test_requirements_exists(self, repo_files):
         """Test that requirements.txt exists"""
-        assert os.path.exists("requirements.txt")
+        assert "requirements.txt" in repo_files
 
-    def test_requirements_has_core_deps(self):
+    def test_requirements_has_core_deps(self, requirements_text_lower):
         """Test requirements has core dependencies"""
-        with open("requirements.txt", "r") as f:
-            content = f.read().lower()
-            assert "requests" in content
-            assert "python-dotenv" in content
-            assert "openpyxl" in content
-            assert "tqdm" in content
-
-    def test_requirements_dev_exists(self):
+        assert "requests" in requirements_text_lower
+        assert "python-dotenv" in requirements_text_lower
+        assert "openpyxl" in requirements_text_lower
+        assert "tqdm" in requirements_text_lower
+
+    def test_requirements_dev_exists(self, repo_files):
         """Test that requirements-dev.txt exists"""
-        assert os.path.exists("requirements-dev.txt")
+        assert "requirements-dev.txt" in repo_files
 
-    def test_requirements_dev_has_test_deps(self):
+    def test_requirements_dev_has_test_deps(self, requirements_dev_text_lower):
         """Test requirements-dev has testing dependencies"""
-        with open("requirements-dev.txt", "r") as f:
-            content = f.read().lower()
-            assert "pytest" in content
-            assert "black" in content
-            assert "flake8" in content
+        assert "pytest" in requirements_dev_text_lower
+        assert "black" in requirements_dev_text_lower
+        assert "flake8" in requirements_dev_text_lower
@@ -2,213 +2,259 @@
 Unit tests for fetch_flights.py
 """
 
+import csv
+import importlib.util
+import io
 import json
 import os
 import sys
-from unittest.mock import Mock, patch
+import threading
+from datetime import date, timedelta
+from unittest.mock import MagicMock, Mock, mock_open, patch
 
 import pytest
 import requests
-
-# Add parent directory to path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from openpyxl import load_workbook
+
+import fetch_flights
+from fetch_flights import (
+    AIRLABS_BASE_URL,
+    EXCEL_COLUMN_WIDTHS,
+    MAX_PAGINATION_PAGES,
+    MAX_WORKERS,
+    PAGINATION_DELAY,
+    RateLimiter,
+    _has_checkpoint,
+    _json_loads,
+    create_session,
+    export_to_csv,
+    export_to_excel,
+    export_to_json,
+    extract_flight_data,
+    fetch_date_range,
+    fetch_flights_for_date,
+    fetch_single_page,
+    filter_by_hub,
+    generate_output_filename,
+    generate_summary,
+    get_airline_info,
+    get_api_key,
+    interactive_mode,
+    list_airlines,
+    load_airlines_config,
+    load_checkpoint,
+    main,
+    save_checkpoint,
+    validate_api_key,
+    validate_date,
+)
+
+
+def _page(start, stop):
+    """One API page holding flights SQ<start> .. SQ<stop - 1>"""
+    return {"response": [{"flight_iata": f"SQ{i}"} for i in range(start, stop)]}
 
 
 class TestFetchFlightsForDate:
     """Tests for fetch_flights_for_date function (with pagination)"""
 
-    def test_fetch_success_single_page(
-        self, mock_api_key, mock_api_response, sample_date
+    @pytest.mark.parametrize(
+        "pages,expected_len,expected_pages,expected_complete",
+        [
+            ([_page(0, 3)], 3, 1, True),
+            ([_page(0, 50), _page(50, 80)], 80, 2, True),
+            ([None], None, None, None),
+            ([_page(0, 0)], 0, 1, True),
+            # Issue 9: a failure mid-way keeps the pages already fetched
+            ([_page(0, 50), None], 50, 1, False),
+            # Issue 10: exactly 50 flights still fetches the empty page after
+            ([_page(0, 50), _page(0, 0)], 50, 2, True),
+        ],
+        ids=[
+            "single_page",
+            "multiple_pages",
+            "timeout",
+            "empty_response",
+            "fails_midway",
+            "exactly_50_flights",
+        ],
+    )
+    def test_fetch_pages(
+        self,
+        pages,
+        expected_len,
+        expected_pages,
+        expected_complete,
+        mock_api_key,
+        sample_date,
+        monkeypatch,
     ):
-        """Test successful flight data fetch (single page, < 50 results)"""
-        with patch("fetch_flights.fetch_single_page") as mock_fetch:
-            mock_fetch.return_value = mock_api_response
-
-            from fetch_flights import fetch_flights_for_date
-
-            result = fetch_flights_for_date(mock_api_key, "SQ", sample_date)
-
-            assert result is not None
-            assert "response" in result
-            assert len(result["response"]) == 3
-            assert result.get("pages_fetched") == 1
-
-    def test_fetch_success_multiple_pages(self, mock_api_key, sample_date):
-        """Test pagination - fetches multiple pages when 50+ results"""
-        page1 = {"response": [{"flight_iata": f"SQ{i}"} for i in range(50)]}
-        page2 = {"response": [{"flight_iata": f"SQ{i}"} for i in range(50, 80)]}
-
-        with patch("fetch_flights.fetch_single_page") as mock_fetch:
-            mock_fetch.side_effect = [page1, page2]
-
-            from fetch_flights import fetch_flights_for_date
-
-            with patch("time.sleep"):  # Skip pagination delay
-                result = fetch_flights_for_date(mock_api_key, "SQ", sample_date)
-
-            assert result is not None
-            assert len(result["response"]) == 80  # 50 + 30
-            assert result.get("pages_fetched") == 2
-            assert mock_fetch.call_count == 2
-
-    def test_fetch_timeout(self, mock_api_key, sample_date):
-        """Test handling of request timeout"""
-        with patch("fetch_flights.fetch_single_page") as mock_fetch:
-            mock_fetch.return_value = None
+        """Test result shape for each sequence of fetch_single_page results"""
+        remaining = iter(pages)
+        monkeypatch.setattr(
+            "fetch_flights.fetch_single_page", lambda *args, **kwargs: next(remaining)
+        )
 
-            from fetch_flights import fetch_flights_for_date
+        result = fetch_flights_for_date(mock_api_key, "SQ", sample_date)
 
-            result = fetch_flights_for_date(mock_api_key, "SQ", sample_date)
+        if expected_len is None:
             assert result is None
-
-    def test_fetch_empty_response(self, mock_api_key, sample_date):
-        """Test handling of empty response"""
-        with patch("fetch_flights.fetch_single_page") as mock_fetch:
-            mock_fetch.return_value = {"response": []}
-
-            from fetch_flights import fetch_flights_for_date
-
-            result = fetch_flights_for_date(mock_api_key, "SQ", sample_date)
-
-            assert result is not None
-            assert result["response"] == []
-            assert result.get("pages_fetched") == 1  # Issue 11: Verify pages_fetched
-
-    def test_fetch_pagination_fails_midway(self, mock_api_key, sample_date):
-        """Test pagination failure mid-way returns partial data (Issue 9)"""
-        page1 = {"response": [{"flight_iata": f"SQ{i}"} for i in range(50)]}
-
-        with patch("fetch_flights.fetch_single_page") as mock_fetch:
-            # First page succeeds, second page fails
-            mock_fetch.side_effect = [page1, None]
-
-            from fetch_flights import fetch_flights_for_date
-
-            with patch("time.sleep"):  # Skip pagination delay
-                result = fetch_flights_for_date(mock_api_key, "SQ", sample_date)
-
-            assert result is not None
-            assert len(result["response"]) == 50  # Only first page data
-            assert result.get("pages_fetched") == 1
-
-    def test_fetch_exactly_50_flights_single_page(self, mock_api_key, sample_date):
-        """Test edge case where exactly 50 flights returned then empty page (Issue 10)"""
-        page1 = {"response": [{"flight_iata": f"SQ{i}"} for i in range(50)]}
-        page2 = {"response": []}  # Empty second page
+        else:
+            assert len(result["response"]) == expected_len
+            assert result.get("pages_fetched") == expected_pages
+            assert result["complete"] is expected_complete
+        # Every scripted page was requested, and no more
+        assert next(remaining, "done") == "done"
+
+    def test_fetch_pages_paced_by_shared_limiter(self, mock_api_key, sample_date):
+        """Test pages wait on the shared limiter instead of a fixed delay"""
+        page1, page2 = _page(0, 50), _page(50, 80)
+        limiter = Mock()
 
         with patch("fetch_flights.fetch_single_page") as mock_fetch:
             mock_fetch.side_effect = [page1, page2]
 
-            from fetch_flights import fetch_flights_for_date
+            with patch("time.sleep") as mock_sleep:
+                result = fetch_flights_for_date(
+                    mock_api_key, "SQ", sample_date, limiter=limiter
+                )
 
-            with patch("time.sleep"):
-                result = fetch_flights_for_date(mock_api_key, "SQ", sample_date)
+        assert result["pages_fetched"] == 2
+        assert limiter.acquire.call_count == 2
+        mock_sleep.assert_not_called()
 
-            assert result is not None
-            assert len(result["response"]) == 50
-            assert result.get("pages_fetched") == 2  # Still fetched 2 pages to verify
-
-    def test_fetch_hits_max_pagination_limit(self, mock_api_key, sample_date):
+    def test_fetch_pagination_delay_counts_request_time(
+        self, mock_api_key, sample_date, monkeypatch
+    ):
+        """Test slow pages only wait out the rest of PAGINATION_DELAY"""
+        # A fake clock that only moves when a request runs or the code sleeps
+        clock = {"now": 100.0}
+        sleeps = []
+        starts = []
+        pages = iter([_page(0, 50), _page(50, 80)])
+
+        def fake_sleep(seconds):
+            sleeps.append(seconds)
+            clock["now"] += seconds
+
+        def fake_fetch(*args, **kwargs):
+            starts.append(clock["now"])
+            clock["now"] += 0.2  # Each request takes 0.2s
+            return next(pages)
+
+        monkeypatch.setattr("time.monotonic", lambda: clock["now"])
+        monkeypatch.setattr("time.sleep", fake_sleep)
+        monkeypatch.setattr("fetch_flights.fetch_single_page", fake_fetch)
+
+        fetch_flights_for_date(mock_api_key, "SQ", sample_date)
+
+        # Request starts are PAGINATION_DELAY apart, not request time + delay
+        assert starts == pytest.approx([100.0, 100.0 + PAGINATION_DELAY])
+        assert sum(sleeps) == pytest.approx(PAGINATION_DELAY - 0.2)
+
+    def test_fetch_hits_max_pagination_limit(
+        self, mock_api_key, sample_date, monkeypatch
+    ):
         """Test safety limit prevents infinite loops"""
         # Create a page that always returns exactly 50 results (simulating API bug)
-        full_page = {"response": [{"flight_iata": f"SQ{i}"} for i in range(50)]}
+        full_page = _page(0, 50)
+        calls = 0
 
-        with patch("fetch_flights.fetch_single_page") as mock_fetch:
-            # Return 50 results indefinitely (API_PAGE_LIMIT)
-            mock_fetch.return_value = full_page
+        def fake_fetch(*args, **kwargs):
+            # A bare counter; this runs MAX_PAGINATION_PAGES times
+            nonlocal calls
+            calls += 1
+            return full_page
 
-            from fetch_flights import MAX_PAGINATION_PAGES, fetch_flights_for_date
+        monkeypatch.setattr("fetch_flights.fetch_single_page", fake_fetch)
 
-            with patch("time.sleep"):
-                result = fetch_flights_for_date(mock_api_key, "SQ", sample_date)
+        result = fetch_flights_for_date(mock_api_key, "SQ", sample_date)
 
-            assert result is not None
-            # Should stop at MAX_PAGINATION_PAGES
-            assert result.get("pages_fetched") == MAX_PAGINATION_PAGES
-            assert mock_fetch.call_count == MAX_PAGINATION_PAGES
+        assert result is not None
+        # Should stop at MAX_PAGINATION_PAGES
+        assert result.get("pages_fetched") == MAX_PAGINATION_PAGES
+        assert result["complete"] is False
+        assert calls == MAX_PAGINATION_PAGES
 
 
 class TestFetchSinglePage:
     """Tests for fetch_single_page function (low-level API call)"""
 
     def test_fetch_single_page_success(
-        self, mock_api_key, mock_api_response, sample_date
+        self, mock_api_key, mock_api_response, sample_date, requests_mock
     ):
         """Test successful single page fetch"""
-        with patch("requests.get") as mock_get:
-            mock_response = Mock()
-            mock_response.status_code = 200
-            mock_response.json.return_value = mock_api_response
-            mock_response.raise_for_status = Mock()
-            mock_get.return_value = mock_response
+        requests_mock.get(AIRLABS_BASE_URL, json=mock_api_response)
 
-            from fetch_flights import fetch_single_page
+        result = fetch_single_page(mock_api_key, "SQ", sample_date, offset=0)
 
-            result = fetch_single_page(mock_api_key, "SQ", sample_date, offset=0)
-
-            assert result is not None
-            assert "response" in result
+        assert result is not None
+        assert "response" in result
 
     def test_fetch_single_page_with_offset(
-        self, mock_api_key, mock_api_response, sample_date
+        self, mock_api_key, mock_api_response, sample_date, requests_mock
     ):
         """Test fetch with offset parameter"""
-        with patch("requests.get") as mock_get:
-            mock_response = Mock()
-            mock_response.status_code = 200
-            mock_response.json.return_value = mock_api_response
-            mock_response.raise_for_status = Mock()
-            mock_get.return_value = mock_response
+        requests_mock.get(AIRLABS_BASE_URL, json=mock_api_response)
 
-            from fetch_flights import fetch_single_page
+        fetch_single_page(mock_api_key, "SQ", sample_date, offset=100)
 
-            fetch_single_page(mock_api_key, "SQ", sample_date, offset=100)
+        # Verify offset was passed to API
+        params = requests_mock.last_request.qs
+        assert params["offset"] == ["100"]
+        assert params["limit"] == ["50"]  # AirLabs FREE tier limit
 
-            # Verify offset was passed to API
-            call_args = mock_get.call_args
-            assert call_args[1]["params"]["offset"] == 100
-            assert call_args[1]["params"]["limit"] == 50  # AirLabs FREE tier limit
+    def test_fetch_single_page_through_session(
+        self, mock_api_key, mock_api_response, sample_date, requests_mock
+    ):
+        """Test the pooled session path is stubbed at the transport layer too"""
+        requests_mock.get(AIRLABS_BASE_URL, json=mock_api_response)
 
-    def test_fetch_single_page_timeout(self, mock_api_key, sample_date):
-        """Test handling of request timeout"""
-        with patch("requests.get") as mock_get:
-            mock_get.side_effect = requests.exceptions.Timeout("Connection timeout")
+        session = create_session()
+        try:
+            result = fetch_single_page(mock_api_key, "SQ", sample_date, 0, session)
+        finally:
+            session.close()
+
+        assert len(result["response"]) == 3
+        assert requests_mock.call_count == 1
 
-            from fetch_flights import fetch_single_page
+    def test_fetch_single_page_timeout(self, mock_api_key, sample_date, requests_mock):
+        """Test handling of request timeout"""
+        requests_mock.get(AIRLABS_BASE_URL, exc=requests.exceptions.Timeout)
 
-            with patch("time.sleep"):  # Skip retry delays
-                result = fetch_single_page(mock_api_key, "SQ", sample_date)
+        result = fetch_single_page(mock_api_key, "SQ", sample_date)
 
-            assert result is None
+        assert result is None
 
-    def test_fetch_single_page_http_error(self, mock_api_key, sample_date):
+    def test_fetch_single_page_http_error(
+        self, mock_api_key, sample_date, requests_mock
+    ):
         """Test handling of HTTP errors"""
-        with patch("requests.get") as mock_get:
-            mock_response = Mock()
-            mock_response.status_code = 500
-            mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError(
-                "Server error"
-            )
-            mock_get.return_value = mock_response
+        requests_mock.get(AIRLABS_BASE_URL, status_code=500)
 
-            from fetch_flights import fetch_single_page
+        result = fetch_single_page(mock_api_key, "SQ", sample_date)
+        assert result is None
 
-            result = fetch_single_page(mock_api_key, "SQ", sample_date)
-            assert result is None
+    def test_fetch_single_page_invalid_json(
+        self, mock_api_key, sample_date, requests_mock, silent_print
+    ):
+        """Test handling of a malformed JSON body"""
+        requests_mock.get(AIRLABS_BASE_URL, content=b"<html>Bad Gateway</html>")
 
-    def test_fetch_single_page_api_error_response(self, mock_api_key, sample_date):
-        """Test handling of API error in response"""
-        with patch("requests.get") as mock_get:
-            mock_response = Mock()
-            mock_response.status_code = 200
-            mock_response.json.return_value = {"error": {"message": "Invalid API key"}}
-            mock_response.raise_for_status = Mock()
-            mock_get.return_value = mock_response
+        result = fetch_single_page(mock_api_key, "SQ", sample_date)
+        assert result is None
 
-            from fetch_flights import fetch_single_page
+    def test_fetch_single_page_api_error_response(
+        self, mock_api_key, sample_date, requests_mock
+    ):
+        """Test handling of API error in response"""
+        requests_mock.get(
+            AIRLABS_BASE_URL, json={"error": {"message": "Invalid API key"}}
+        )
 
-            result = fetch_single_page(mock_api_key, "SQ", sample_date)
-            assert result is None
+        result = fetch_single_page(mock_api_key, "SQ", sample_date)
+        assert result is None
 
 
 class TestExtractFlightData:
@@ -216,8 +262,6 @@ class TestExtractFlightData:
 
     def test_extract_success(self, mock_api_response):
         """Test flight data extraction and normalization"""
-        from fetch_flights import extract_flight_data
-
         flights = extract_flight_data(mock_api_response)
 
         assert len(flights) == 3
@@ -229,15 +273,11 @@ class TestExtractFlightData:
 
     def test_extract_empty_response(self):
         """Test extraction with empty response"""
-        from fetch_flights import extract_flight_data
-
         flights = extract_flight_data({"response": []})
         assert flights == []
 
     def test_extract_missing_fields(self):
         """Test extraction handles missing fields gracefully"""
-        from fetch_flights import extract_flight_data
-
         data = {
             "response": [
                 {
@@ -261,8 +301,6 @@ class TestFilterByHub:
 
     def test_filter_by_departure_airport(self):
         """Test filtering flights by departure airport"""
-        from fetch_flights import filter_by_hub
-
         flights = [
             {"departure_airport": "SIN", "arrival_airport": "HKG"},
             {"departure_airport": "KUL", "arrival_airport": "BKK"},
@@ -274,8 +312,6 @@ class TestFilterByHub:
 
     def test_filter_by_arrival_airport(self):
         """Test filtering flights by arrival airport"""
-        from fetch_flights import filter_by_hub
-
         flights = [
             {"departure_airport": "HKG", "arrival_airport": "SIN"},
             {"departure_airport": "KUL", "arrival_airport": "BKK"},
@@ -287,8 +323,6 @@ class TestFilterByHub:
 
     def test_filter_case_insensitive(self):
         """Test hub filter is case-insensitive"""
-        from fetch_flights import filter_by_hub
-
         flights = [
             {"departure_airport": "SIN", "arrival_airport": "HKG"},
             {"departure_airport": "KUL", "arrival_airport": "BKK"},
@@ -298,8 +332,6 @@ class TestFilterByHub:
 
     def test_filter_no_matches(self):
         """Test filter returns empty list when no flights match"""
-        from fetch_flights import filter_by_hub
-
         flights = [
             {"departure_airport": "HKG", "arrival_airport": "NRT"},
             {"departure_airport": "KUL", "arrival_airport": "BKK"},
@@ -309,8 +341,6 @@ class TestFilterByHub:
 
     def test_filter_missing_airport_fields(self):
         """Test filter handles missing airport fields gracefully"""
-        from fetch_flights import filter_by_hub
-
         flights = [
             {"departure_airport": "SIN", "arrival_airport": "HKG"},
             {"departure_airport": "KUL"},  # Missing arrival_airport
@@ -324,12 +354,9 @@ class TestFilterByHub:
 class TestGenerateSummary:
     """Tests for generate_summary function"""
 
-    def test_summary_with_flights(self, mock_api_response):
+    def test_summary_with_flights(self, extracted_flights):
         """Test summary generation with flight data"""
-        from fetch_flights import extract_flight_data, generate_summary
-
-        flights = extract_flight_data(mock_api_response)
-        summary = generate_summary(flights)
+        summary = generate_summary(extracted_flights)
 
         assert summary["total_flights"] == 3
         assert "average_delay_minutes" in summary
@@ -337,112 +364,288 @@ class TestGenerateSummary:
         assert "flights_by_status" in summary
         assert "top_routes" in summary
 
+    def test_summary_values(self, extracted_flights):
+        """Test summary statistics are computed correctly"""
+        summary = generate_summary(extracted_flights)
+
+        assert summary["average_delay_minutes"] == 21.0  # (12 + 30) / 2
+        assert summary["on_time_percentage"] == 66.7
+        assert summary["delayed_flights"] == 1
+        assert summary["flights_by_status"] == {"landed": 2, "delayed": 1}
+        assert list(summary["top_routes"]) == ["SIN → LHR", "LHR → SIN", "SIN → HKG"]
+
+    def test_summary_top_routes_limited_to_ten(self):
+        """Test top routes keeps only the 10 busiest routes"""
+        flights = [
+            {
+                "departure_airport": "SIN",
+                "arrival_airport": f"A{i:02d}",
+                "delay_minutes": 0,
+                "flight_status": "landed",
+            }
+            for i in range(12)
+            for _ in range(i + 1)
+        ]
+
+        summary = generate_summary(flights)
+
+        assert len(summary["top_routes"]) == 10
+        assert next(iter(summary["top_routes"].items())) == ("SIN → A11", 12)
+
     def test_summary_empty_flights(self):
         """Test summary with no flights"""
-        from fetch_flights import generate_summary
-
         summary = generate_summary([])
 
         assert summary["total_flights"] == 0
 
 
+def _check_csv_export(path):
+    """The CSV export has a header row plus one row per flight"""
+    with open(path, "r", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        first = next(reader)
+        # Count the rest without materializing them
+        row_count = 1 + sum(1 for _ in reader)
+    assert row_count == 3
+    assert first[header.index("flight_number")] == "SQ317"
+
+
+def _check_json_export(path):
+    """The JSON export holds the flights and their summary"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    assert len(data["flights"]) == 3
+    assert data["flights"][0]["flight_number"] == "SQ317"
+    assert data["summary"]["total_flights"] == 3
+
+
+def _check_excel_export(path):
+    """The Excel export has the header and flights on the data sheet"""
+    # read_only streams the sheet XML instead of building the full graph
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb["Flight Data"]
+        assert ws.cell(1, 1).value == "Flight"
+        assert ws.cell(2, 1).value == "SQ317"
+    finally:
+        wb.close()
+
+
 class TestExportFunctions:
     """Tests for export functions"""
 
-    def test_export_to_csv(self, mock_api_response, temp_output_dir):
-        """Test CSV export functionality"""
-        import csv
+    @pytest.mark.parametrize(
+        "exporter,ext,needs_summary,extra,check",
+        [
+            (export_to_csv, "csv", False, (), _check_csv_export),
+            (export_to_json, "json", True, (), _check_json_export),
+            (
+                export_to_excel,
+                "xlsx",
+                True,
+                ("Singapore Airlines",),
+                _check_excel_export,
+            ),
+        ],
+        ids=["csv", "json", "excel"],
+    )
+    def test_export(
+        self,
+        exporter,
+        ext,
+        needs_summary,
+        extra,
+        check,
+        extracted_flights,
+        flight_summary,
+        tmp_path,
+    ):
+        """Test each exporter writes a readable file with all flights"""
+        out = tmp_path / f"test_flights.{ext}"
+        summary_args = (flight_summary,) if needs_summary else ()
 
-        from fetch_flights import export_to_csv, extract_flight_data
+        exporter(extracted_flights, *summary_args, *extra, str(out))
 
-        flights = extract_flight_data(mock_api_response)
-        csv_file = os.path.join(temp_output_dir, "test_flights.csv")
+        check(out)
 
-        export_to_csv(flights, csv_file)
+    def test_export_to_json_file_object(
+        self, extracted_flights, flight_summary, capsys
+    ):
+        """Test JSON export into an in-memory text buffer logs nothing"""
+        buf = io.StringIO()
 
-        assert os.path.exists(csv_file)
+        export_to_json(extracted_flights, flight_summary, buf)
 
-        with open(csv_file, "r") as f:
-            reader = csv.DictReader(f)
-            rows = list(reader)
-            assert len(rows) == 3
-            assert rows[0]["flight_number"] == "SQ317"
+        assert capsys.readouterr().out == ""
+        buf.seek(0)
+        data = json.load(buf)
+        assert "flights" in data
+        assert "summary" in data
+        assert len(data["flights"]) == 3
 
-    def test_export_to_json(self, mock_api_response, temp_output_dir):
-        """Test JSON export functionality"""
-        from fetch_flights import export_to_json, extract_flight_data, generate_summary
+    def test_export_to_excel_openpyxl_engine(
+        self, extracted_flights, flight_summary, monkeypatch
+    ):
+        """Test Excel export with the openpyxl engine hands the path to save()"""
+        saved = []
+
+        def fake_save(wb, path):
+            # Finish the write-only sheet streams but skip building the zip
+            for ws in wb.worksheets:
+                ws.close()
+            saved.append(path)
+
+        monkeypatch.setattr("openpyxl.Workbook.save", fake_save)
+
+        export_to_excel(
+            extracted_flights,
+            flight_summary,
+            "Singapore Airlines",
+            "test_flights_openpyxl.xlsx",
+            engine="openpyxl",
+        )
 
-        flights = extract_flight_data(mock_api_response)
-        summary = generate_summary(flights)
-        json_file = os.path.join(temp_output_dir, "test_flights.json")
+        assert saved == ["test_flights_openpyxl.xlsx"]
 
-        export_to_json(flights, summary, json_file)
+    @pytest.mark.parametrize("engine", ["xlsxwriter", "openpyxl", "raw"])
+    def test_export_to_excel_fixed_column_widths(
+        self, engine, extracted_flights, flight_summary, temp_output_dir
+    ):
+        """Test data sheet widths come from the fixed table, not an auto-fit pass"""
+        excel_file = os.path.join(temp_output_dir, f"test_widths_{engine}.xlsx")
 
-        assert os.path.exists(json_file)
+        export_to_excel(
+            extracted_flights, flight_summary, "SQ", excel_file, engine=engine
+        )
 
-        with open(json_file, "r") as f:
-            data = json.load(f)
-            assert "flights" in data
-            assert "summary" in data
-            assert len(data["flights"]) == 3
+        # Engines may write adjacent equal widths as one <col min max> range
+        widths = {}
+        for dim in load_workbook(excel_file)["Flight Data"].column_dimensions.values():
+            for col in range(dim.min, dim.max + 1):
+                widths[col] = dim.width
+        for col, width in enumerate(EXCEL_COLUMN_WIDTHS.values(), 1):
+            # xlsxwriter stores widths with its own sub-character padding
+            assert widths[col] == pytest.approx(width, abs=1)
+
+    @pytest.mark.parametrize("engine", ["xlsxwriter", "raw"])
+    def test_export_to_excel_control_characters(self, engine, tmp_path):
+        """Test control characters are stored as _xHHHH_ escapes, not raw XML"""
+        flights = extract_flight_data(
+            {"response": [{"flight_iata": "SQ1", "dep_time": "a\x01b"}]}
+        )
+        excel_file = tmp_path / f"control_{engine}.xlsx"
 
-    def test_export_to_excel(self, mock_api_response, temp_output_dir):
-        """Test Excel export functionality"""
-        from fetch_flights import export_to_excel, extract_flight_data, generate_summary
+        export_to_excel(
+            flights, generate_summary(flights), "SQ", str(excel_file), engine=engine
+        )
 
-        flights = extract_flight_data(mock_api_response)
-        summary = generate_summary(flights)
-        excel_file = os.path.join(temp_output_dir, "test_flights.xlsx")
+        wb = load_workbook(excel_file, read_only=True, data_only=True)
+        try:
+            row = next(wb["Flight Data"].iter_rows(min_row=2, values_only=True))
+            assert row[3] == "a_x0001_b"
+        finally:
+            wb.close()
 
-        export_to_excel(flights, summary, "Singapore Airlines", excel_file)
+    def test_export_to_excel_raw_engine(
+        self, extracted_flights, flight_summary, temp_output_dir
+    ):
+        """Test hand-written xlsx export opens with the expected rows"""
+        excel_file = os.path.join(temp_output_dir, "test_flights_raw.xlsx")
+
+        export_to_excel(
+            extracted_flights,
+            flight_summary,
+            "Singapore Airlines",
+            excel_file,
+            engine="raw",
+        )
 
-        assert os.path.exists(excel_file)
+        wb = load_workbook(excel_file, read_only=True, data_only=True)
+        try:
+            rows = list(wb["Flight Data"].iter_rows(values_only=True))
+            assert wb.sheetnames == ["Flight Data", "Summary"]
+            assert rows[0][0] == "Flight"
+            assert rows[1][:3] == ("SQ317", "SIN", "LHR")
+            assert rows[1][7] == 12
+            assert wb["Summary"]["B3"].value == 3
+        finally:
+            wb.close()
 
 
 class TestValidation:
     """Tests for validation functions"""
 
-    def test_validate_date_valid(self):
+    @pytest.mark.parametrize(
+        "date_str",
+        ["2025-01-01", "2025-12-31", "2024-02-29"],  # incl. leap day
+    )
+    def test_validate_date_valid(self, date_str):
         """Test date validation with valid dates"""
-        from fetch_flights import validate_date
-
-        assert validate_date("2025-01-01") is True
-        assert validate_date("2025-12-31") is True
-        assert validate_date("2024-02-29") is True  # Leap year
-
-    def test_validate_date_invalid(self):
+        assert validate_date(date_str) is True
+
+    @pytest.mark.parametrize(
+        "date_str",
+        [
+            "2025-13-01",
+            "01-01-2025",
+            "2025/01/01",
+            "invalid",
+            "2025-1-1",
+            "2025-01-01\n",
+            "2025-02-29",  # not a leap year
+            "20250101",
+            "",
+        ],
+    )
+    def test_validate_date_invalid(self, date_str):
         """Test date validation with invalid dates"""
-        from fetch_flights import validate_date
-
-        assert validate_date("2025-13-01") is False
-        assert validate_date("01-01-2025") is False
-        assert validate_date("2025/01/01") is False
-        assert validate_date("invalid") is False
-        assert validate_date("") is False
+        assert validate_date(date_str) is False
 
-    def test_validate_api_key_valid(self):
+    @pytest.mark.parametrize("api_key", ["a" * 25, "abc123def456ghi789jkl012"])
+    def test_validate_api_key_valid(self, api_key):
         """Test API key validation with valid keys"""
-        from fetch_flights import validate_api_key
+        assert validate_api_key(api_key) is True
 
-        assert validate_api_key("a" * 25) is True
-        assert validate_api_key("abc123def456ghi789jkl012") is True
-
-    def test_validate_api_key_invalid(self):
+    @pytest.mark.parametrize("api_key", ["", "short", None])
+    def test_validate_api_key_invalid(self, api_key):
         """Test API key validation with invalid keys"""
-        from fetch_flights import validate_api_key
-
-        assert validate_api_key("") is False
-        assert validate_api_key("short") is False
-        assert validate_api_key(None) is False
+        assert validate_api_key(api_key) is False
 
 
 class TestAirlineConfig:
     """Tests for airline configuration functions"""
 
+    def test_get_airline_info_builds_index_once(self, mock_airline_config, monkeypatch):
+        """Test repeated lookups on one config reuse its cached index"""
+        # The session config may already be indexed by an earlier test
+        monkeypatch.setattr(fetch_flights, "_AIRLINE_INDEX_CACHE", {})
+        with patch(
+            "fetch_flights._build_airline_index",
+            wraps=fetch_flights._build_airline_index,
+        ) as mock_build:
+            for code in ("SQ", "sia", "EK", "XX"):
+                get_airline_info(code, mock_airline_config)
+
+        assert mock_build.call_count == 1
+
+    def test_airline_index_cache_is_bounded(self, monkeypatch):
+        """Test the index cache evicts old configs instead of growing forever"""
+        # A private cache, so later tests in this worker start from a clean one
+        cache = {}
+        monkeypatch.setattr(fetch_flights, "_AIRLINE_INDEX_CACHE", cache)
+        configs = [
+            {"airlines": {"SQ": {"name": f"Config {i}"}}}
+            for i in range(fetch_flights._AIRLINE_INDEX_CACHE_SIZE + 5)
+        ]
+        for config in configs:
+            assert get_airline_info("SQ", config) is config["airlines"]["SQ"]
+
+        assert len(cache) == fetch_flights._AIRLINE_INDEX_CACHE_SIZE
+        assert id(configs[-1]) in cache
+
     def test_get_airline_info_by_iata(self, mock_airline_config):
         """Test getting airline info by IATA code"""
-        from fetch_flights import get_airline_info
-
         info = get_airline_info("SQ", mock_airline_config)
 
         assert info is not None
@@ -450,25 +653,29 @@ class TestAirlineConfig:
 
     def test_get_airline_info_by_icao(self, mock_airline_config):
         """Test getting airline info by ICAO code"""
-        from fetch_flights import get_airline_info
-
         info = get_airline_info("SIA", mock_airline_config)
 
         assert info is not None
         assert info["name"] == "Singapore Airlines"
 
+    def test_get_airline_info_by_icao_does_not_mutate_config(self):
+        """Test ICAO lookup returns a copy instead of modifying the config"""
+        # A private config without "iata", so the lookup has to fill it in
+        config = {"airlines": {"EK": {"name": "Emirates", "icao": "UAE"}}}
+
+        info = get_airline_info("UAE", config)
+
+        assert info["iata"] == "EK"
+        assert "iata" not in config["airlines"]["EK"]
+
     def test_get_airline_info_not_found(self, mock_airline_config):
         """Test getting info for unknown airline"""
-        from fetch_flights import get_airline_info
-
         info = get_airline_info("XX", mock_airline_config)
 
         assert info is None
 
     def test_get_airline_info_case_insensitive(self, mock_airline_config):
         """Test airline lookup is case insensitive"""
-        from fetch_flights import get_airline_info
-
         info_lower = get_airline_info("sq", mock_airline_config)
         info_upper = get_airline_info("SQ", mock_airline_config)
 
@@ -480,38 +687,75 @@ class TestAirlineConfig:
 class TestLoadAirlinesConfig:
     """Tests for load_airlines_config function"""
 
-    def test_load_config_success(self):
-        """Test successful config loading"""
-        from fetch_flights import load_airlines_config
+    @pytest.fixture(autouse=True)
+    def clear_config_cache(self):
+        """Start each test with an empty load_airlines_config cache"""
+        load_airlines_config.cache_clear()
 
+    def test_load_config_success(self, real_airlines_config):
+        """Test successful config loading"""
         config = load_airlines_config()
 
         assert isinstance(config, dict)
         assert "airlines" in config
         assert "SQ" in config["airlines"]
+        # The session fixture holds the same parse for other tests to reuse
+        assert config == real_airlines_config
+
+    def test_load_config_cached(self):
+        """Test config file is read once per process"""
+        with patch("fetch_flights._json_loads", wraps=_json_loads) as mock_json_loads:
+            first = load_airlines_config()
+            second = load_airlines_config()
+
+        assert first is second
+        assert mock_json_loads.call_count == 1
 
-    @patch("builtins.open")
-    def test_load_config_file_not_found(self, mock_open):
+    def test_load_config_file_not_found(self, monkeypatch, capsys):
         """Test handling of missing config file"""
-        from fetch_flights import load_airlines_config
+        # Shadow open only inside fetch_flights, not for the whole interpreter
+        monkeypatch.setattr(
+            "fetch_flights.open", Mock(side_effect=FileNotFoundError()), raising=False
+        )
 
-        mock_open.side_effect = FileNotFoundError()
+        with pytest.raises(SystemExit):
+            load_airlines_config()
 
-        with patch("builtins.print"):
-            with pytest.raises(SystemExit):
-                load_airlines_config()
+        assert "[ERROR] Config file not found" in capsys.readouterr().out
 
-    @patch("builtins.open")
-    @patch("json.load")
-    def test_load_config_invalid_json(self, mock_json_load, mock_open):
+    def test_load_config_invalid_json(self, monkeypatch, capsys):
         """Test handling of invalid JSON in config"""
-        from fetch_flights import load_airlines_config
+        monkeypatch.setattr(
+            "fetch_flights.open", mock_open(read_data=b"{"), raising=False
+        )
+
+        with pytest.raises(SystemExit):
+            load_airlines_config()
+
+        assert "[ERROR] Invalid JSON in config file" in capsys.readouterr().out
 
-        mock_json_load.side_effect = json.JSONDecodeError("Invalid JSON", "", 0)
 
-        with patch("builtins.print"):
-            with pytest.raises(SystemExit):
-                load_airlines_config()
+class TestLazyImports:
+    """Tests that heavy optional modules are not imported at startup"""
+
+    def test_import_skips_excel_and_progress_libraries(self):
+        """Test importing fetch_flights does not load openpyxl/xlsxwriter/tqdm"""
+        import subprocess
+
+        code = (
+            "import sys, fetch_flights; "
+            "print(sorted(m for m in ('openpyxl', 'xlsxwriter', 'tqdm', 'dotenv') "
+            "if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        assert result.stdout.strip() == "[]"
 
 
 class TestListAirlines:
@@ -519,8 +763,6 @@ class TestListAirlines:
 
     def test_list_airlines(self, mock_airline_config, capsys):
         """Test listing airlines"""
-        from fetch_flights import list_airlines
-
         list_airlines(mock_airline_config)
 
         output = capsys.readouterr().out
@@ -535,8 +777,6 @@ class TestGetApiKey:
 
     def test_get_api_key_from_env(self, mock_env_vars, capsys):
         """Test getting API key from environment"""
-        from fetch_flights import get_api_key
-
         api_key = get_api_key()
 
         assert api_key == "test_api_key_1234567890abcdef"
@@ -544,10 +784,11 @@ class TestGetApiKey:
         assert "[INFO] Using API key from .env file" in output
 
     @patch("builtins.input")
-    def test_get_api_key_from_input(self, mock_input, monkeypatch, capsys):
+    @patch("dotenv.load_dotenv")  # Ignore any developer .env file
+    def test_get_api_key_from_input(
+        self, mock_load_dotenv, mock_input, monkeypatch, capsys
+    ):
         """Test getting API key from user input"""
-        from fetch_flights import get_api_key
-
         monkeypatch.delenv("AIRLABS_API_KEY", raising=False)
         mock_input.return_value = "user_entered_key_12345"
 
@@ -558,125 +799,137 @@ class TestGetApiKey:
         assert "[WARN] No API key found" in output
 
     @patch("builtins.input")
-    def test_get_api_key_empty_input(self, mock_input, monkeypatch):
+    @patch("dotenv.load_dotenv")  # Ignore any developer .env file
+    def test_get_api_key_empty_input(
+        self, mock_load_dotenv, mock_input, monkeypatch, silent_print
+    ):
         """Test handling of empty API key input"""
-        from fetch_flights import get_api_key
-
         monkeypatch.delenv("AIRLABS_API_KEY", raising=False)
         mock_input.return_value = ""
 
-        with patch("builtins.print"):
-            with pytest.raises(SystemExit):
-                get_api_key()
+        with pytest.raises(SystemExit):
+            get_api_key()
 
 
 class TestFetchFlightsRetry:
     """Tests for fetch_single_page retry logic"""
 
-    def test_fetch_retry_on_timeout(self, mock_api_key, sample_date):
+    def test_fetch_retry_on_timeout(self, mock_api_key, sample_date, requests_mock):
         """Test retry logic on timeout"""
-        from fetch_flights import fetch_single_page
-
-        with patch("requests.get") as mock_get:
-            # First two attempts timeout, third succeeds
-            mock_response = Mock()
-            mock_response.status_code = 200
-            mock_response.json.return_value = {"response": []}
-            mock_response.raise_for_status = Mock()
-
-            mock_get.side_effect = [
-                requests.exceptions.Timeout("Timeout 1"),
-                requests.exceptions.Timeout("Timeout 2"),
-                mock_response,
-            ]
+        # First two attempts timeout, third succeeds
+        requests_mock.get(
+            AIRLABS_BASE_URL,
+            [
+                {"exc": requests.exceptions.Timeout},
+                {"exc": requests.exceptions.Timeout},
+                {"json": {"response": []}},
+            ],
+        )
 
-            with patch("time.sleep"):
-                result = fetch_single_page(mock_api_key, "SQ", sample_date)
+        result = fetch_single_page(mock_api_key, "SQ", sample_date)
 
-            assert result is not None
-            assert mock_get.call_count == 3
+        assert result is not None
+        assert requests_mock.call_count == 3
 
-    def test_fetch_retry_on_rate_limit(self, mock_api_key, sample_date):
+    def test_fetch_retry_on_rate_limit(self, mock_api_key, sample_date, requests_mock):
         """Test retry logic on rate limiting"""
-        from fetch_flights import fetch_single_page
+        requests_mock.get(
+            AIRLABS_BASE_URL,
+            [{"status_code": 429}, {"json": {"response": []}}],
+        )
 
-        with patch("requests.get") as mock_get:
-            mock_response_429 = Mock()
-            mock_response_429.status_code = 429
-            mock_response_429.raise_for_status.side_effect = (
-                requests.exceptions.HTTPError("Rate limited")
-            )
+        result = fetch_single_page(mock_api_key, "SQ", sample_date)
 
-            mock_response_200 = Mock()
-            mock_response_200.status_code = 200
-            mock_response_200.json.return_value = {"response": []}
-            mock_response_200.raise_for_status = Mock()
+        assert result is not None
+        assert requests_mock.call_count == 2
 
-            mock_get.side_effect = [mock_response_429, mock_response_200]
+    @pytest.mark.parametrize(
+        "failure",
+        [{"exc": requests.exceptions.Timeout}, {"status_code": 429}],
+        ids=["timeout", "rate_limited"],
+    )
+    def test_fetch_retries_wait_on_limiter(
+        self, failure, mock_api_key, sample_date, requests_mock
+    ):
+        """Test each retry takes a slot from the shared limiter"""
+        requests_mock.get(
+            AIRLABS_BASE_URL, [failure, failure, {"json": {"response": []}}]
+        )
+        limiter = Mock()
 
-            with patch("time.sleep"):
-                result = fetch_single_page(mock_api_key, "SQ", sample_date)
+        result = fetch_single_page(mock_api_key, "SQ", sample_date, limiter=limiter)
 
-            assert result is not None
-            assert mock_get.call_count == 2
+        assert result is not None
+        # The caller paces the first attempt; the two retries pace themselves
+        assert limiter.acquire.call_count == 2
 
 
 class TestSaveCheckpoint:
-    """Tests for save_checkpoint function"""
+    """Tests for save_checkpoint function (each test gets an empty tmp_path)"""
 
-    def test_save_checkpoint(self, mock_api_response, temp_output_dir, monkeypatch):
+    def test_save_checkpoint(self, mock_api_response, tmp_path, monkeypatch):
         """Test checkpoint file creation"""
-        import fetch_flights
-        from fetch_flights import save_checkpoint
+        monkeypatch.setattr(fetch_flights, "OUTPUT_DIR", str(tmp_path))
 
-        # Temporarily change OUTPUT_DIR for test
-        original_dir = fetch_flights.OUTPUT_DIR
-        fetch_flights.OUTPUT_DIR = temp_output_dir
+        filepath = save_checkpoint(mock_api_response, "SQ", "2025-01-01")
 
-        try:
-            filepath = save_checkpoint(mock_api_response, "SQ", "2025-01-01")
+        assert "checkpoint_SQ_2025-01-01.json" in filepath
+        assert os.path.exists(filepath)
 
-            assert "checkpoint_SQ_2025-01-01.json" in filepath
-            assert os.path.exists(filepath)
+        with open(filepath, "r") as f:
+            data = json.load(f)
+            assert data == mock_api_response
 
-            with open(filepath, "r") as f:
-                data = json.load(f)
-                assert data == mock_api_response
-        finally:
-            fetch_flights.OUTPUT_DIR = original_dir
+    def test_save_checkpoint_without_orjson(
+        self, mock_api_response, tmp_path, monkeypatch
+    ):
+        """Test checkpoint falls back to compact stdlib JSON"""
+        monkeypatch.setattr(fetch_flights, "OUTPUT_DIR", str(tmp_path))
+        monkeypatch.setattr(fetch_flights, "orjson", None)
 
+        filepath = save_checkpoint(mock_api_response, "SQ", "2025-01-01")
 
-class TestGenerateOutputFilename:
-    """Tests for generate_output_filename function"""
+        with open(filepath, "r", encoding="utf-8") as f:
+            content = f.read()
+        assert "\n" not in content and ", " not in content
+        assert json.loads(content) == mock_api_response
 
-    def test_generate_output_filename_csv(self):
-        """Test filename generation for CSV"""
-        from fetch_flights import generate_output_filename
+    def test_save_checkpoint_is_atomic(self, mock_api_response, tmp_path, monkeypatch):
+        """Test checkpoint is renamed into place with no .tmp left behind"""
+        monkeypatch.setattr(fetch_flights, "OUTPUT_DIR", str(tmp_path))
 
-        filename = generate_output_filename("SQ", "csv")
+        assert not _has_checkpoint("SQ", "2025-01-01")
+        save_checkpoint(mock_api_response, "SQ", "2025-01-01")
 
-        assert "SQ_" in filename
-        assert filename.endswith(".csv")
-        assert "outputs" in filename
+        assert os.listdir(tmp_path) == ["checkpoint_SQ_2025-01-01.json"]
+        assert _has_checkpoint("SQ", "2025-01-01")
+        assert load_checkpoint("SQ", "2025-01-01") == mock_api_response
 
-    def test_generate_output_filename_excel(self):
-        """Test filename generation for Excel"""
-        from fetch_flights import generate_output_filename
+    def test_save_checkpoint_creates_output_dir(
+        self, mock_api_response, tmp_path, monkeypatch
+    ):
+        """Test saving works on a fresh checkout without an outputs folder"""
+        out_dir = tmp_path / "outputs"
+        monkeypatch.setattr(fetch_flights, "OUTPUT_DIR", str(out_dir))
 
-        filename = generate_output_filename("EK", "excel")
+        filepath = save_checkpoint(mock_api_response, "SQ", "2025-01-01")
 
-        assert "EK_" in filename
-        assert filename.endswith(".xlsx")
-        assert "outputs" in filename
+        assert os.path.exists(filepath)
 
-    def test_generate_output_filename_json(self):
-        """Test filename generation for JSON"""
-        from fetch_flights import generate_output_filename
 
-        filename = generate_output_filename("QR", "json")
+class TestGenerateOutputFilename:
+    """Tests for generate_output_filename function"""
 
-        assert "QR_" in filename
-        assert filename.endswith(".json")
+    @pytest.mark.parametrize(
+        "airline,output_format,extension",
+        [("SQ", "csv", ".csv"), ("EK", "excel", ".xlsx"), ("QR", "json", ".json")],
+    )
+    def test_generate_output_filename(self, airline, output_format, extension):
+        """Test filename generation for each output format"""
+        filename = generate_output_filename(airline, output_format)
+
+        assert f"{airline}_" in filename
+        assert filename.endswith(extension)
         assert "outputs" in filename
 
 
@@ -686,16 +939,12 @@ class TestInteractiveMode:
     @patch("builtins.input")
     def test_interactive_mode_defaults(self, mock_input, mock_airline_config):
         """Test interactive mode with default values"""
-        from fetch_flights import interactive_mode
-
         mock_input.side_effect = ["", "", "", ""]  # All defaults
 
         airline, start_date, end_date, output_format = interactive_mode(
             mock_airline_config
         )
 
-        from fetch_flights import validate_date
-
         assert airline == "SQ"
         assert output_format == "excel"
         assert validate_date(start_date)
@@ -704,8 +953,6 @@ class TestInteractiveMode:
     @patch("builtins.input")
     def test_interactive_mode_custom_values(self, mock_input, mock_airline_config):
         """Test interactive mode with custom values"""
-        from fetch_flights import interactive_mode
-
         mock_input.side_effect = ["EK", "2025-01-01", "2025-01-07", "csv"]
 
         airline, start_date, end_date, output_format = interactive_mode(
@@ -722,8 +969,6 @@ class TestInteractiveMode:
         self, mock_input, mock_airline_config, capsys
     ):
         """Test interactive mode with list command"""
-        from fetch_flights import interactive_mode
-
         mock_input.side_effect = ["list", "SQ", "", "", ""]
 
         airline, start_date, end_date, output_format = interactive_mode(
@@ -738,251 +983,345 @@ class TestInteractiveMode:
 class TestFetchDateRange:
     """Tests for fetch_date_range function (with pagination support)"""
 
-    @patch("fetch_flights.tqdm")
+    @pytest.fixture(autouse=True)
+    def mock_tqdm(self, monkeypatch):
+        """Replace tqdm with a MagicMock so no test draws a progress bar"""
+        mock = MagicMock()
+        monkeypatch.setattr("tqdm.tqdm", mock)
+        return mock
+
     @patch("fetch_flights.fetch_flights_for_date")
     @patch("fetch_flights.save_checkpoint")
-    @patch("time.sleep")
     def test_fetch_date_range_single_day(
         self,
-        mock_sleep,
         mock_save,
         mock_fetch,
-        mock_tqdm,
         mock_api_key,
         mock_api_response,
     ):
         """Test fetching single day"""
-        from fetch_flights import fetch_date_range
-
         # Add pages_fetched to mock response (pagination metadata)
         mock_response = {**mock_api_response, "pages_fetched": 1}
         mock_fetch.return_value = mock_response
-        mock_tqdm.return_value.__enter__.return_value = Mock()
 
-        flights = fetch_date_range(mock_api_key, "SQ", "2025-01-01", "2025-01-01")
+        flights = fetch_date_range(
+            mock_api_key, "SQ", date(2025, 1, 1), date(2025, 1, 1)
+        )
 
         assert len(flights) == 3
         assert mock_fetch.call_count == 1
         assert mock_save.call_count == 1
 
-    @patch("fetch_flights.tqdm")
     @patch("fetch_flights.fetch_flights_for_date")
     @patch("fetch_flights.save_checkpoint")
-    @patch("time.sleep")
     def test_fetch_date_range_multiple_days(
         self,
-        mock_sleep,
         mock_save,
         mock_fetch,
-        mock_tqdm,
         mock_api_key,
         mock_api_response,
     ):
         """Test fetching multiple days"""
-        from fetch_flights import fetch_date_range
-
         # Add pages_fetched to mock response (pagination metadata)
         mock_response = {**mock_api_response, "pages_fetched": 1}
         mock_fetch.return_value = mock_response
-        mock_tqdm.return_value.__enter__.return_value = Mock()
 
-        flights = fetch_date_range(mock_api_key, "SQ", "2025-01-01", "2025-01-03")
+        flights = fetch_date_range(
+            mock_api_key, "SQ", date(2025, 1, 1), date(2025, 1, 3)
+        )
 
         assert len(flights) == 9  # 3 days * 3 flights
         assert mock_fetch.call_count == 3
         assert mock_save.call_count == 3
 
-    @patch("fetch_flights.tqdm")
     @patch("fetch_flights.fetch_flights_for_date")
-    @patch("time.sleep")
-    def test_fetch_date_range_no_data(
-        self, mock_sleep, mock_fetch, mock_tqdm, mock_api_key
+    @patch("fetch_flights.save_checkpoint")
+    def test_fetch_date_range_progress_batched(
+        self,
+        mock_save,
+        mock_fetch,
+        mock_api_key,
+        mock_api_response,
+        mock_tqdm,
     ):
-        """Test fetching when no data returned"""
-        from fetch_flights import fetch_date_range
+        """Test the progress bar postfix is deferred and hidden off a TTY"""
+        mock_fetch.return_value = {**mock_api_response, "pages_fetched": 1}
+        pbar = mock_tqdm.return_value.__enter__.return_value
 
+        with patch("sys.stderr.isatty", return_value=False):
+            fetch_date_range(mock_api_key, "SQ", date(2025, 1, 1), date(2025, 1, 1))
+
+        assert mock_tqdm.call_args.kwargs["disable"] is True
+        pbar.set_postfix_str.assert_called_once_with(
+            "flights=3, pages=1", refresh=False
+        )
+
+    @patch("fetch_flights.fetch_flights_for_date")
+    @patch("fetch_flights.save_checkpoint")
+    def test_fetch_date_range_without_checkpoints(
+        self,
+        mock_save,
+        mock_fetch,
+        mock_api_key,
+        mock_api_response,
+    ):
+        """Test checkpoint files are skipped when disabled"""
+        mock_fetch.return_value = {**mock_api_response, "pages_fetched": 1}
+
+        flights = fetch_date_range(
+            mock_api_key,
+            "SQ",
+            date(2025, 1, 1),
+            date(2025, 1, 2),
+            checkpoints=False,
+        )
+
+        assert len(flights) == 6
+        mock_save.assert_not_called()
+
+    @patch("fetch_flights.fetch_flights_for_date")
+    def test_fetch_date_range_no_data(self, mock_fetch, mock_api_key):
+        """Test fetching when no data returned"""
         mock_fetch.return_value = None
-        mock_tqdm.return_value.__enter__.return_value = Mock()
 
-        flights = fetch_date_range(mock_api_key, "SQ", "2025-01-01", "2025-01-01")
+        flights = fetch_date_range(
+            mock_api_key, "SQ", date(2025, 1, 1), date(2025, 1, 1)
+        )
 
         assert flights == []
 
+    @patch("fetch_flights.fetch_flights_for_date")
+    @patch("fetch_flights.save_checkpoint")
+    def test_fetch_date_range_keeps_date_order(
+        self, mock_save, mock_fetch, mock_api_key
+    ):
+        """Test concurrent fetches are assembled in date order"""
 
-class TestMainFunction:
-    """Tests for main() function"""
+        def fake_fetch(api_key, airline, date, verbose, session, limiter=None):
+            return {"response": [{"flight_iata": date}], "pages_fetched": 1}
 
-    @patch("fetch_flights.list_airlines")
-    def test_main_list_airlines(self, mock_list, mock_airline_config):
-        """Test --list-airlines command"""
-        from fetch_flights import main
+        mock_fetch.side_effect = fake_fetch
 
-        with patch("sys.argv", ["fetch_flights.py", "--list-airlines"]):
-            with patch(
-                "fetch_flights.load_airlines_config", return_value=mock_airline_config
-            ):
-                with patch("sys.exit") as mock_exit:
-                    mock_exit.side_effect = SystemExit(0)
-                    with pytest.raises(SystemExit):
-                        main()
+        flights = fetch_date_range(
+            mock_api_key, "SQ", date(2025, 1, 1), date(2025, 1, 5)
+        )
 
-        mock_list.assert_called_once()
-        mock_exit.assert_called_once_with(0)
+        assert [f["flight_number"] for f in flights] == [
+            "2025-01-01",
+            "2025-01-02",
+            "2025-01-03",
+            "2025-01-04",
+            "2025-01-05",
+        ]
 
-    @patch("fetch_flights.fetch_date_range")
-    @patch("fetch_flights.get_api_key")
-    @patch("builtins.input")
-    @patch("fetch_flights.validate_api_key")
-    @patch("fetch_flights.export_to_excel")
-    @patch("fetch_flights.generate_output_filename")
-    @patch("fetch_flights.generate_summary")
-    def test_main_yesterday_flag(
+    @patch("fetch_flights.fetch_flights_for_date")
+    def test_fetch_date_range_resume_skips_checkpointed_days(
         self,
-        mock_summary,
-        mock_filename,
-        mock_export,
-        mock_validate,
-        mock_input,
-        mock_get_key,
         mock_fetch,
-        mock_airline_config,
+        mock_api_key,
         mock_api_response,
+        tmp_path,
+        monkeypatch,
     ):
-        """Test main with --yesterday flag"""
-        from fetch_flights import extract_flight_data, main
-
-        mock_get_key.return_value = "test_key"
-        mock_validate.return_value = True
-        mock_input.return_value = "y"
-        mock_fetch.return_value = extract_flight_data(mock_api_response)
-        mock_filename.return_value = "outputs/test.xlsx"
-        mock_summary.return_value = {
-            "total_flights": 3,
-            "average_delay_minutes": 5.0,
-            "on_time_percentage": 80.0,
-            "cancelled_flights": 0,
-        }
+        """Test --resume loads saved days instead of calling the API"""
+        monkeypatch.setattr(fetch_flights, "OUTPUT_DIR", str(tmp_path))
+        save_checkpoint(mock_api_response, "SQ", "2025-01-01")
+        mock_fetch.return_value = {"response": [], "pages_fetched": 1}
 
-        with patch("sys.argv", ["fetch_flights.py", "--airline", "SQ", "--yesterday"]):
-            with patch(
-                "fetch_flights.load_airlines_config", return_value=mock_airline_config
-            ):
-                with patch("builtins.print"):
-                    main()
+        flights = fetch_date_range(
+            mock_api_key, "SQ", date(2025, 1, 1), date(2025, 1, 2), resume=True
+        )
 
+        assert len(flights) == 3
         mock_fetch.assert_called_once()
-        mock_export.assert_called_once()
+        assert mock_fetch.call_args.args[2] == "2025-01-02"
 
-    @patch("sys.exit")
-    @patch("builtins.input")
-    def test_main_invalid_airline(self, mock_input, mock_exit, mock_airline_config):
-        """Test main with invalid airline"""
-        from fetch_flights import main
+    def test_fetch_date_range_resume_refetches_partial_day(
+        self, mock_api_key, tmp_path, monkeypatch
+    ):
+        """Test --resume re-fetches a day whose pagination failed mid-way"""
+        monkeypatch.setattr(fetch_flights, "OUTPUT_DIR", str(tmp_path))
+        pages = iter([_page(0, 50), None, _page(0, 50), _page(50, 80)])
+        monkeypatch.setattr(
+            "fetch_flights.fetch_single_page", lambda *args, **kwargs: next(pages)
+        )
 
-        def side_effect(*args):
-            raise SystemExit(1)
+        first = fetch_date_range(mock_api_key, "SQ", date(2025, 1, 1), date(2025, 1, 1))
+        assert len(first) == 50
+        assert load_checkpoint("SQ", "2025-01-01")["complete"] is False
 
-        mock_exit.side_effect = side_effect
+        resumed = fetch_date_range(
+            mock_api_key, "SQ", date(2025, 1, 1), date(2025, 1, 1), resume=True
+        )
 
-        with patch("sys.argv", ["fetch_flights.py", "--airline", "XX", "--yesterday"]):
-            with patch(
-                "fetch_flights.load_airlines_config", return_value=mock_airline_config
-            ):
-                with patch("builtins.print"):
-                    with pytest.raises(SystemExit):
-                        main()
+        assert len(resumed) == 80
+        assert next(pages, "done") == "done"
+        assert load_checkpoint("SQ", "2025-01-01")["complete"] is True
 
-        mock_exit.assert_called_once_with(1)
+    def test_fetch_date_range_error_cancels_queued_days(
+        self, mock_api_key, monkeypatch
+    ):
+        """Test a failing day stops the queued days from being fetched"""
+        fetched = []
+        slow = threading.Event()
+
+        def fake_fetch(api_key, airline, date, verbose, session, limiter=None):
+            fetched.append(date)
+            if date == "2025-01-01":
+                raise RuntimeError("boom")
+            # Keep the other workers busy while the error reaches the caller
+            slow.wait(0.2)
+            return {"response": [], "pages_fetched": 1}
+
+        monkeypatch.setattr("fetch_flights.fetch_flights_for_date", fake_fetch)
+
+        with pytest.raises(RuntimeError):
+            fetch_date_range(
+                mock_api_key,
+                "SQ",
+                date(2025, 1, 1),
+                date(2025, 1, 20),
+                checkpoints=False,
+            )
 
-    @patch("sys.exit")
-    def test_main_missing_start_date(self, mock_exit, mock_airline_config):
-        """Test main with missing start date"""
-        from fetch_flights import main
+        # Only days already on a worker ran (the failed worker may grab one more)
+        assert len(fetched) <= MAX_WORKERS + 1
 
-        def side_effect(*args):
-            raise SystemExit(1)
 
-        mock_exit.side_effect = side_effect
+class TestCreateSession:
+    """Tests for create_session function"""
 
-        with patch("sys.argv", ["fetch_flights.py", "--airline", "SQ"]):
-            with patch(
-                "fetch_flights.load_airlines_config", return_value=mock_airline_config
-            ):
-                with patch("builtins.print"):
-                    with pytest.raises(SystemExit):
-                        main()
+    def test_create_session_pooled_without_retries(self):
+        """Test session mounts a pooled adapter with urllib3 retries disabled"""
+        session = create_session()
+        try:
+            adapter = session.get_adapter("https://airlabs.co/api/v9/schedules")
 
-        mock_exit.assert_called_once_with(1)
+            assert adapter._pool_maxsize == MAX_WORKERS
+            assert adapter.max_retries.total == 0
+        finally:
+            session.close()
 
-    @patch("sys.exit")
-    def test_main_invalid_date(self, mock_exit, mock_airline_config):
-        """Test main with invalid date format"""
-        from fetch_flights import main
 
-        def side_effect(*args):
-            raise SystemExit(1)
+class TestRateLimiter:
+    """Tests for RateLimiter class"""
 
-        mock_exit.side_effect = side_effect
+    def test_rate_limiter_spaces_requests(self):
+        """Test consecutive acquires are spaced by the limiter interval"""
+        with patch("time.monotonic", return_value=100.0):
+            limiter = RateLimiter(max_per_second=2)
+            with patch("time.sleep") as mock_sleep:
+                limiter.acquire()
+                limiter.acquire()
+                limiter.acquire()
 
-        with patch(
-            "sys.argv",
-            ["fetch_flights.py", "--airline", "SQ", "--start-date", "invalid-date"],
-        ):
-            with patch(
-                "fetch_flights.load_airlines_config", return_value=mock_airline_config
-            ):
-                with patch("builtins.print"):
-                    with pytest.raises(SystemExit):
-                        main()
-
-        mock_exit.assert_called_once_with(1)
-
-    @patch("fetch_flights.fetch_date_range")
-    @patch("fetch_flights.get_api_key")
-    @patch("builtins.input")
-    @patch("sys.exit")
-    def test_main_no_flights_found(
-        self, mock_exit, mock_input, mock_get_key, mock_fetch, mock_airline_config
-    ):
-        """Test main when no flights are found"""
-        from fetch_flights import main
+        # First request goes immediately, the next two wait 0.5s and 1.0s
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [0.5, 1.0]
 
-        def side_effect(*args):
-            raise SystemExit(0)
 
-        mock_exit.side_effect = side_effect
-        mock_get_key.return_value = "test_key"
-        mock_input.return_value = "y"
-        mock_fetch.return_value = []
+class TestMainFunction:
+    """Tests for main() function"""
 
-        with patch("sys.argv", ["fetch_flights.py", "--airline", "SQ", "--yesterday"]):
-            with patch(
-                "fetch_flights.load_airlines_config", return_value=mock_airline_config
-            ):
-                with patch("builtins.print"):
-                    with pytest.raises(SystemExit):
-                        main()
+    @pytest.fixture
+    def main_env(self, monkeypatch, mock_airline_config, silent_print):
+        """Run main() with the mock config, silenced output and a given argv"""
+        monkeypatch.setattr(
+            "fetch_flights.load_airlines_config", lambda: mock_airline_config
+        )
 
-        mock_exit.assert_called_once_with(0)
+        def run(*argv):
+            monkeypatch.setattr("sys.argv", ["fetch_flights.py", *argv])
+            return main()
 
-    @patch("fetch_flights.fetch_date_range")
-    @patch("fetch_flights.get_api_key")
-    @patch("builtins.input")
-    @patch("sys.exit")
-    def test_main_user_cancels(
-        self, mock_exit, mock_input, mock_get_key, mock_fetch, mock_airline_config
+        return run
+
+    def test_main_list_airlines(self, mocker, main_env):
+        """Test --list-airlines command"""
+        mock_list = mocker.patch("fetch_flights.list_airlines")
+
+        with pytest.raises(SystemExit) as exc:
+            main_env("--list-airlines")
+
+        mock_list.assert_called_once()
+        assert exc.value.code == 0
+
+    def test_main_yesterday_flag(
+        self, mocker, main_env, extracted_flights, flight_summary
     ):
-        """Test main when user cancels"""
-        from fetch_flights import main
+        """Test main with --yesterday flag"""
+        mocker.patch("builtins.input", return_value="y")
+        mocker.patch("fetch_flights.get_api_key", return_value="test_key")
+        mocker.patch("fetch_flights.validate_api_key", return_value=True)
+        mock_fetch = mocker.patch(
+            "fetch_flights.fetch_date_range", return_value=extracted_flights
+        )
+        mocker.patch(
+            "fetch_flights.generate_output_filename", return_value="outputs/test.xlsx"
+        )
+        mocker.patch("fetch_flights.generate_summary", return_value=flight_summary)
+        mock_export = mocker.patch("fetch_flights.export_to_excel")
 
-        mock_get_key.return_value = "test_key"
-        mock_input.return_value = "n"
+        main_env("--airline", "SQ", "--yesterday")
+
+        mock_fetch.assert_called_once()
+        mock_export.assert_called_once()
+        # Dates are parsed once in main and passed down as date objects
+        start, end = mock_fetch.call_args.args[2:4]
+        assert start == end == date.today() - timedelta(days=1)
+
+    @pytest.mark.parametrize(
+        "argv",
+        [
+            ("--airline", "XX", "--yesterday"),
+            ("--airline", "SQ"),
+            ("--airline", "SQ", "--start-date", "invalid-date"),
+        ],
+        ids=["invalid_airline", "missing_start_date", "invalid_date"],
+    )
+    def test_main_bad_arguments(self, argv, mocker, main_env):
+        """Test main exits with status 1 on bad CLI arguments"""
+        mock_input = mocker.patch("builtins.input")
+
+        with pytest.raises(SystemExit) as exc:
+            main_env(*argv)
+
+        assert exc.value.code == 1
+        mock_input.assert_not_called()
+
+    def test_main_missing_excel_engine(self, mocker, main_env):
+        """Test main stops before fetching when the Excel engine is missing"""
+        real_find_spec = importlib.util.find_spec
+        mocker.patch(
+            "importlib.util.find_spec",
+            side_effect=lambda name, *args: (
+                None if name == "xlsxwriter" else real_find_spec(name, *args)
+            ),
+        )
+        mock_input = mocker.patch("builtins.input")
+        mock_fetch = mocker.patch("fetch_flights.fetch_date_range")
+
+        with pytest.raises(SystemExit) as exc:
+            main_env("--airline", "SQ", "--yesterday")
+
+        assert exc.value.code == 1
+        mock_input.assert_not_called()
+        mock_fetch.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "answer,flights",
+        [("y", []), ("n", None)],
+        ids=["no_flights_found", "user_cancels"],
+    )
+    def test_main_exits_cleanly(self, answer, flights, mocker, main_env):
+        """Test main exits with status 0 when cancelled or nothing is found"""
+        mocker.patch("builtins.input", return_value=answer)
+        mocker.patch("fetch_flights.get_api_key", return_value="test_key")
+        mock_fetch = mocker.patch(
+            "fetch_flights.fetch_date_range", return_value=flights
+        )
 
-        with patch("sys.argv", ["fetch_flights.py", "--airline", "SQ", "--yesterday"]):
-            with patch(
-                "fetch_flights.load_airlines_config", return_value=mock_airline_config
-            ):
-                with patch("builtins.print"):
-                    main()
+        with pytest.raises(SystemExit) as exc:
+            main_env("--airline", "SQ", "--yesterday")
 
-        mock_exit.assert_called_once_with(0)
+        assert exc.value.code == 0
+        assert mock_fetch.called == (answer == "y")